@@ -151,8 +151,8 @@ export default function OrdersListPage() {
                 <CardContent className="pt-0">
                   <div className="flex items-center justify-between text-sm text-muted-foreground">
                     <span>{formatDate(order.created_at)}</span>
-                    {order.lyrics_versions.length > 0 && (
-                      <span>{order.lyrics_versions.length} версий текста</span>
+                    {order.lyrics_version_seq > 0 && (
+                      <span>{order.lyrics_version_seq} версий текста</span>
                     )}
                   </div>
                 </CardContent>
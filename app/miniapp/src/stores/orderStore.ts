@@ -1,7 +1,8 @@
 import { create } from 'zustand'
 import { apiClient } from '@/lib/api'
 
-export interface Order {
+// Order list item: no notes or related data
+export interface OrderSummary {
   id: number
   status: 'draft' | 'pending_lyrics' | 'lyrics_ready' | 'user_editing' | 'approved' | 'generating' | 'delivered' | 'canceled'
   language: 'ru' | 'kz' | 'en'
@@ -10,12 +11,16 @@ export interface Order {
   tempo?: string
   occasion?: string
   recipient?: string
-  notes?: string
   price?: number
   currency: string
   payment_status: 'none' | 'pending' | 'paid' | 'failed' | 'refunded'
   created_at: string
   updated_at: string
+  lyrics_version_seq: number
+}
+
+export interface Order extends OrderSummary {
+  notes?: string
   lyrics_versions: LyricsVersion[]
   audio_assets: AudioAsset[]
 }
@@ -48,7 +53,7 @@ export interface OrderCreateData {
 }
 
 export interface OrderState {
-  orders: Order[]
+  orders: OrderSummary[]
   currentOrder: Order | null
   isLoading: boolean
   error: string | null
@@ -3,18 +3,26 @@
 import hashlib
 import hmac
 import json
+import time
 import urllib.parse
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import structlog
 from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
 from core.config import settings
+from core.redis import get_redis
+from core.responses import PrebuiltJSONResponse
 from models.user import User
-from schemas.auth import TelegramAuthRequest, AuthResponse
+from schemas.auth import TelegramAuthRequest, AuthResponse, UserResponse
 from domain.auth_service import AuthService
 
+logger = structlog.get_logger()
+
 router = APIRouter()
 
 
@@ -26,35 +34,46 @@ class TelegramInitData(BaseModel):
     hash: str
 
 
+@lru_cache(maxsize=4)
+def _webapp_secret_key(bot_token: str) -> bytes:
+    """Derive the WebApp data secret key for a bot token."""
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+
+# Derive the secret key once at startup instead of on every login
+_webapp_secret_key(settings.telegram_bot_token)
+
+
+def _parse_init_data(init_data: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """Split init data into its hash and the remaining fields in one pass."""
+    received_hash = None
+    fields = {}
+    for pair in init_data.split("&"):
+        if not pair:
+            continue
+        key, _, value = pair.partition("=")
+        key = urllib.parse.unquote_plus(key)
+        value = urllib.parse.unquote_plus(value)
+        if key == "hash":
+            received_hash = value
+        elif key not in fields:
+            fields[key] = value
+    return received_hash, fields
+
+
 def verify_telegram_webapp_data(init_data: str, bot_token: str) -> Optional[TelegramInitData]:
-    """Verify Telegram WebApp init data signature."""
+    """Verify Telegram WebApp init data signature and freshness."""
     try:
-        # Parse init data
-        parsed_data = urllib.parse.parse_qs(init_data)
-        
-        # Extract hash
-        received_hash = parsed_data.get('hash', [None])[0]
+        received_hash, fields = _parse_init_data(init_data)
         if not received_hash:
             return None
         
-        # Remove hash from data
-        data_check_string_parts = []
-        for key, value in parsed_data.items():
-            if key != 'hash':
-                data_check_string_parts.append(f"{key}={value[0]}")
-        
-        data_check_string = '\n'.join(sorted(data_check_string_parts))
-        
-        # Create secret key
-        secret_key = hmac.new(
-            "WebAppData".encode(),
-            bot_token.encode(),
-            hashlib.sha256
-        ).digest()
+        # Data-check string: fields sorted by key, joined with newlines
+        data_check_string = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
         
         # Calculate hash
         calculated_hash = hmac.new(
-            secret_key,
+            _webapp_secret_key(bot_token),
             data_check_string.encode(),
             hashlib.sha256
         ).hexdigest()
@@ -63,13 +82,15 @@ def verify_telegram_webapp_data(init_data: str, bot_token: str) -> Optional[Tele
         if not hmac.compare_digest(calculated_hash, received_hash):
             return None
         
-        # Parse user data
-        user_data = json.loads(parsed_data.get('user', ['{}'])[0])
+        # Reject stale init data
+        auth_date = int(fields.get("auth_date", "0"))
+        if time.time() - auth_date > settings.telegram_auth_max_age:
+            return None
         
         return TelegramInitData(
-            query_id=parsed_data.get('query_id', [''])[0],
-            user=user_data,
-            auth_date=int(parsed_data.get('auth_date', ['0'])[0]),
+            query_id=fields.get("query_id", ""),
+            user=json.loads(fields.get("user", "{}")),
+            auth_date=auth_date,
             hash=received_hash
         )
         
@@ -77,16 +98,32 @@ def verify_telegram_webapp_data(init_data: str, bot_token: str) -> Optional[Tele
         return None
 
 
-@router.post("/auth/telegram/verify", response_model=AuthResponse)
-async def verify_telegram_auth(
-    request: TelegramAuthRequest,
-    db: AsyncSession = Depends(get_db)
-):
-    """Verify Telegram WebApp authentication."""
+def _replay_key(init_data: TelegramInitData) -> str:
+    return f"tg_auth:{init_data.hash}"
+
+
+def _auth_response(auth_service: AuthService, user: User) -> str:
+    """Issue a token for ``user`` and serialize the ``AuthResponse``."""
+    response = AuthResponse(
+        access_token=auth_service.create_access_token(user.id, user),
+        token_type="bearer",
+        user=UserResponse.model_validate(user, from_attributes=True)
+    )
+    return response.model_dump_json()
+
+
+async def authenticate_init_data(raw_init_data: str, db: AsyncSession, redis: Redis) -> str:
+    """Authenticate Telegram init data and return the ``AuthResponse`` JSON.
+    
+    The same init data is sent every time the mini app is reopened within
+    a session. The user ID is cached by init data hash until it goes
+    stale, so repeats skip the upsert and answer from the user cache,
+    which profile writes invalidate.
+    """
     
     # Verify init data
     init_data = verify_telegram_webapp_data(
-        request.init_data,
+        raw_init_data,
         settings.telegram_bot_token
     )
     
@@ -96,6 +133,18 @@ async def verify_telegram_auth(
             detail="Invalid Telegram authentication data"
         )
     
+    auth_service = AuthService(db)
+    
+    try:
+        cached_user_id = await redis.get(_replay_key(init_data))
+    except Exception as e:
+        logger.warning("Auth replay cache read failed", error=str(e))
+        cached_user_id = None
+    if cached_user_id is not None and cached_user_id.isdigit():
+        user = await auth_service.get_cached_user(int(cached_user_id))
+        if user is not None:
+            return _auth_response(auth_service, user)
+    
     # Get user data
     user_data = init_data.user
     telegram_id = user_data.get('id')
@@ -107,7 +156,6 @@ async def verify_telegram_auth(
         )
     
     # Get or create user
-    auth_service = AuthService(db)
     user = await auth_service.get_or_create_user(
         telegram_id=telegram_id,
         username=user_data.get('username'),
@@ -117,19 +165,33 @@ async def verify_telegram_auth(
     )
     
     # Generate JWT token
-    token = auth_service.create_access_token(user.id)
+    body = _auth_response(auth_service, user)
     
-    return AuthResponse(
-        access_token=token,
-        token_type="bearer",
-        user=user
-    )
+    # Cache until the init data itself would be rejected as stale
+    ttl = int(settings.telegram_auth_max_age - (time.time() - init_data.auth_date))
+    if ttl > 0:
+        try:
+            await redis.set(_replay_key(init_data), user.id, ex=ttl)
+        except Exception as e:
+            logger.warning("Auth replay cache write failed", error=str(e))
+    
+    return body
+
+
+@router.post("/auth/telegram/verify", response_model=AuthResponse)
+async def verify_telegram_auth(
+    request: TelegramAuthRequest,
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+):
+    """Verify Telegram WebApp authentication."""
+    body = await authenticate_init_data(request.init_data, db, redis)
+    return PrebuiltJSONResponse(body)
 
 
-@router.get("/auth/me")
+@router.get("/auth/me", response_model=UserResponse)
 async def get_current_user(
-    current_user: User = Depends(AuthService.get_current_user)
+    current_user: User = Depends(AuthService.get_current_user_from_claims)
 ):
     """Get current user information."""
     return current_user
-
@@ -0,0 +1,60 @@
+"""Mini app bootstrap endpoint."""
+
+import asyncio
+import orjson
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import AsyncSessionLocal, get_db
+from core.redis import get_redis
+from core.responses import model_response
+from schemas.auth import TelegramAuthRequest
+from schemas.bootstrap import BootstrapResponse, BOOTSTRAP_RESPONSE_ADAPTER
+from domain.order_service import OrderService
+from .auth import authenticate_init_data
+
+router = APIRouter()
+
+
+async def _first_orders_page(user_id: int):
+    async with AsyncSessionLocal() as db:
+        return await OrderService(db).get_user_orders(
+            user_id=user_id,
+            limit=settings.bootstrap_orders_limit,
+            include_total=False,
+        )
+
+
+async def _active_latest_lyrics(user_id: int):
+    async with AsyncSessionLocal() as db:
+        return await OrderService(db).get_active_latest_lyrics(user_id)
+
+
+@router.post("/bootstrap", response_model=BootstrapResponse)
+async def bootstrap(
+    request: TelegramAuthRequest,
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+):
+    """Authenticate and return the mini app's initial state.
+    
+    Replaces the verify, ``/auth/me``, ``/orders`` and latest lyrics
+    calls made on open. Orders and lyrics are loaded concurrently, each
+    on its own session.
+    """
+    auth = orjson.loads(await authenticate_init_data(request.init_data, db, redis))
+    user_id = auth["user"]["id"]
+    
+    (orders, _, next_cursor), latest_lyrics = await asyncio.gather(
+        _first_orders_page(user_id),
+        _active_latest_lyrics(user_id),
+    )
+    
+    return model_response(BOOTSTRAP_RESPONSE_ADAPTER, {
+        **auth,
+        "orders": orders,
+        "next_cursor": next_cursor,
+        "latest_lyrics": latest_lyrics,
+    })
@@ -1,46 +1,209 @@
 """Orders API endpoints."""
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from contextlib import contextmanager
+from typing import FrozenSet, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.database import get_db
+from core.etag import etag_matches, make_etag, not_modified
+from core.events import format_sse, order_events
+from core.security import create_stream_token, get_bearer_token, verify_stream_token
 from models.user import User
-from models.order import Order
+from models.order import Order, OrderStatus
+from core.responses import PrebuiltJSONResponse, model_response
+from core.singleflight import single_flight
 from schemas.order import (
     OrderCreate, OrderUpdate, OrderResponse, OrderListResponse,
-    LyricsGenerateRequest, LyricsEditRequest
+    LyricsGenerateRequest, LyricsEditRequest,
+    ORDER_RESPONSE_ADAPTER, ORDER_LIST_RESPONSE_ADAPTER,
+    ORDER_FIELDS, ORDER_RELATIONS, SUMMARY_FIELDS, order_projection,
+    LYRICS_RESPONSE_ADAPTER
 )
 from domain.auth_service import AuthService
-from domain.order_service import OrderService
+from domain.order_service import InvalidTransition, OrderRef, OrderService, OrderVersion, order_etag
 
 router = APIRouter()
 
+# Statuses after which an order emits no further events
+FINAL_STATUSES = {OrderStatus.DELIVERED.value, OrderStatus.CANCELED.value}
+
+
+@contextmanager
+def transition_errors():
+    """Map rejected status transitions to 409 and other service errors to 400."""
+    try:
+        yield
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_projection(
+    fields: Optional[str],
+    include: Optional[str],
+    default_fields: FrozenSet[str],
+    default_include: FrozenSet[str],
+) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Parse comma-separated ``fields`` and ``include`` query parameters."""
+    
+    def parse(value: Optional[str], allowed: FrozenSet[str], default: FrozenSet[str], name: str):
+        if value is None:
+            return default
+        names = frozenset(item.strip() for item in value.split(",") if item.strip())
+        unknown = names - allowed
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown {name}: {', '.join(sorted(unknown))}"
+            )
+        return names
+    
+    return (
+        parse(fields, ORDER_FIELDS, default_fields, "fields"),
+        parse(include, ORDER_RELATIONS, default_include, "include"),
+    )
+
+
+def check_order_access(order, current_user: User):
+    """Raise 404 or 403 unless the order exists and belongs to the user."""
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    if order.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+async def get_owned_order(
+    order_id: int,
+    current_user: User = Depends(AuthService.get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> OrderRef:
+    """Check that the order exists and belongs to the current user.
+    
+    Loads only ``id, user_id, status``, so action endpoints do not pull
+    the order's relations just to authorize the call.
+    """
+    order = await OrderService(db).get_order_ref(order_id)
+    check_order_access(order, current_user)
+    return order
+
+
+async def get_stream_order(
+    order_id: int,
+    token: Optional[str] = Query(None),
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+) -> OrderRef:
+    """Like ``get_owned_order``, but also accepts a ``?token=`` stream token.
+    
+    Browser ``EventSource`` cannot send an ``Authorization`` header, so it
+    opens the stream with a token from ``POST /orders/{id}/events/token``.
+    """
+    auth_service = AuthService(db)
+    
+    if token is not None:
+        user_id = verify_stream_token(token, order_id)
+    else:
+        bearer = get_bearer_token(authorization)
+        user_id = auth_service.verify_token(bearer) if bearer else None
+        if user_id is not None and await auth_service.get_cached_user(user_id) is None:
+            user_id = None
+    
+    if user_id is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    order = await OrderService(db).get_order_ref(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if order.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return order
+
+
+async def get_owned_order_version(
+    order_id: int,
+    current_user: User = Depends(AuthService.get_current_user_from_claims),
+    db: AsyncSession = Depends(get_db)
+) -> OrderVersion:
+    """Like ``get_owned_order``, but loads what ETags depend on."""
+    version = await OrderService(db).get_order_version(order_id)
+    check_order_access(version, current_user)
+    return version
+
 
 @router.get("/orders", response_model=OrderListResponse)
 async def list_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
-    current_user: User = Depends(AuthService.get_current_user),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor; overrides skip"),
+    include_total: bool = Query(True, description="Include total count"),
+    fields: Optional[str] = Query(None, description="Comma-separated order fields; defaults to the summary"),
+    include: Optional[str] = Query(None, description="Comma-separated relations: lyrics_versions, audio_assets"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(AuthService.get_current_user_from_claims),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get user's orders with pagination."""
+    """Get user's orders with offset or cursor pagination.
+    
+    Items are order summaries (no notes or related data) unless
+    ``fields``/``include`` ask for more; only those columns are loaded.
+    The ETag covers all of the user's orders, so an unchanged list is
+    answered with 304 after one primary key lookup.
+    """
+    order_fields, order_include = parse_projection(fields, include, SUMMARY_FIELDS, frozenset())
     order_service = OrderService(db)
     
-    orders, total = await order_service.get_user_orders(
-        user_id=current_user.id,
-        skip=skip,
-        limit=limit,
-        status=status
-    )
-    
-    return OrderListResponse(
-        items=orders,
-        total=total,
-        skip=skip,
-        limit=limit
+    list_version = await order_service.get_order_list_version(current_user.id)
+    etag = make_etag(
+        "orders",
+        current_user.id,
+        list_version,
+        skip, limit, status, cursor, include_total,
+        ",".join(sorted(order_fields)),
+        ",".join(sorted(order_include)),
     )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    async def load_page() -> bytes:
+        try:
+            orders, total, next_cursor = await order_service.get_user_orders(
+                user_id=current_user.id,
+                skip=skip,
+                limit=limit,
+                status=status,
+                cursor=cursor,
+                include_total=include_total,
+                fields=order_fields,
+                include=order_include,
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        response = OrderListResponse.model_construct(
+            items=[order_projection(order, order_fields, order_include) for order in orders],
+            total=total,
+            skip=0 if cursor else skip,
+            limit=limit,
+            next_cursor=next_cursor,
+        )
+        return ORDER_LIST_RESPONSE_ADAPTER.dump_json(response, exclude_unset=True)
+    
+    # The ETag covers user, parameters and data, so identical concurrent
+    # requests share one page load
+    body = await single_flight.do(("list_orders", etag), load_page)
+    
+    return PrebuiltJSONResponse(body, headers={"ETag": etag})
 
 
 @router.post("/orders", response_model=OrderResponse)
@@ -57,186 +220,234 @@ async def create_order(
         order_data=order_data
     )
     
-    return order
+    return model_response(ORDER_RESPONSE_ADAPTER, order)
 
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
+    fields: Optional[str] = Query(None, description="Comma-separated order fields; defaults to all"),
+    include: Optional[str] = Query(None, description="Comma-separated relations; defaults to all"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(AuthService.get_current_user_from_claims),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get order by ID."""
-    order_service = OrderService(db)
+    """Get order by ID.
     
-    order = await order_service.get_order_by_id(order_id)
-    
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    With ``If-None-Match``, an unchanged order is answered with 304 after
+    one indexed version lookup, before relations are loaded.
+    """
+    order_service = OrderService(db)
     
-    return order
+    full = fields is None and include is None
+    order_fields, order_include = parse_projection(fields, include, ORDER_FIELDS, ORDER_RELATIONS)
+    variant = () if full else (",".join(sorted(order_fields)), ",".join(sorted(order_include)))
+    
+    etag = None
+    if if_none_match is not None or not full:
+        version = await order_service.get_order_version(order_id)
+        check_order_access(version, current_user)
+        etag = order_etag(version, *variant)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
+    if full:
+        # Full order, served from the order cache
+        cached = await order_service.get_order_response(order_id)
+        if not cached:
+            raise HTTPException(status_code=404, detail="Order not found")
+        
+        user_id, cached_etag, body = cached
+        if user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        return PrebuiltJSONResponse(body, headers={"ETag": cached_etag})
+    
+    async def load_projection() -> bytes:
+        order = await order_service.get_order_by_id(order_id, order_fields, order_include)
+        check_order_access(order, current_user)
+        
+        response = order_projection(order, order_fields, order_include)
+        return ORDER_RESPONSE_ADAPTER.dump_json(response, exclude_unset=True)
+    
+    body = await single_flight.do(("get_order", etag), load_projection)
+    
+    return PrebuiltJSONResponse(body, headers={"ETag": etag})
+
+
+@router.post("/orders/{order_id}/events/token")
+async def create_order_events_token(order: OrderRef = Depends(get_owned_order)):
+    """Issue a short-lived token for opening the event stream via ``EventSource``."""
+    return {
+        "token": create_stream_token(order.user_id, order.id),
+        "expires_in": settings.order_events_token_ttl,
+    }
+
+
+@router.get("/orders/{order_id}/events")
+async def order_events_stream(
+    order: OrderRef = Depends(get_stream_order),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream order status changes and task progress as Server-Sent Events.
+    
+    Starts with the current status, then relays status changes from the
+    order change feed and progress steps published by the workers. The
+    stream ends once the order reaches a final status.
+    """
+    # Subscribe before reading the status, so no transition falls in between
+    queue = order_events.subscribe(order.id)
+    try:
+        current = await OrderService(db).get_order_ref(order.id) or order
+    except BaseException:
+        order_events.unsubscribe(order.id, queue)
+        raise
+    finally:
+        # Do not hold a database connection for the lifetime of the stream
+        await db.close()
+    
+    async def stream():
+        try:
+            status = current.status.value
+            yield format_sse("status", {"event": "status", "order_id": order.id, "status": status})
+            if status in FINAL_STATUSES:
+                return
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(),
+                        settings.order_events_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                
+                if event["event"] == "status":
+                    # Already sent if the change landed before the read above
+                    if event.get("status") == status:
+                        continue
+                    status = event.get("status")
+                
+                yield format_sse(event["event"], event)
+                if event["event"] == "status" and status in FINAL_STATUSES:
+                    return
+        finally:
+            order_events.unsubscribe(order.id, queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.patch("/orders/{order_id}", response_model=OrderResponse)
 async def update_order(
-    order_id: int,
     order_data: OrderUpdate,
-    current_user: User = Depends(AuthService.get_current_user),
+    order: OrderRef = Depends(get_owned_order),
     db: AsyncSession = Depends(get_db)
 ):
     """Update order."""
     order_service = OrderService(db)
     
-    order = await order_service.get_order_by_id(order_id)
+    updated_order = await order_service.update_order(order.id, order_data)
     
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    updated_order = await order_service.update_order(order_id, order_data)
-    
-    return updated_order
+    return model_response(ORDER_RESPONSE_ADAPTER, updated_order)
 
 
 @router.post("/orders/{order_id}/lyrics/generate")
 async def generate_lyrics(
-    order_id: int,
     request: LyricsGenerateRequest,
-    current_user: User = Depends(AuthService.get_current_user),
+    order: OrderRef = Depends(get_owned_order),
     db: AsyncSession = Depends(get_db)
 ):
     """Generate lyrics for order."""
     order_service = OrderService(db)
     
-    order = await order_service.get_order_by_id(order_id)
-    
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     # Start lyrics generation task
-    task_id = await order_service.generate_lyrics(order_id, request)
+    with transition_errors():
+        task_id = await order_service.generate_lyrics(order.id, request)
     
     return {"task_id": task_id, "message": "Lyrics generation started"}
 
 
 @router.get("/orders/{order_id}/lyrics/latest")
 async def get_latest_lyrics(
-    order_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    order: OrderVersion = Depends(get_owned_order_version),
     db: AsyncSession = Depends(get_db)
 ):
     """Get latest lyrics version for order."""
-    order_service = OrderService(db)
-    
-    order = await order_service.get_order_by_id(order_id)
+    if order.latest_lyrics_id is None:
+        raise HTTPException(status_code=404, detail="No lyrics found")
     
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    # Lyrics versions are immutable, so the newest ID identifies the response
+    etag = make_etag("lyrics", order.latest_lyrics_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    order_service = OrderService(db)
     
-    lyrics = await order_service.get_latest_lyrics(order_id)
+    lyrics = await order_service.get_latest_lyrics(order.id)
     
     if not lyrics:
         raise HTTPException(status_code=404, detail="No lyrics found")
     
-    return lyrics
+    return model_response(LYRICS_RESPONSE_ADAPTER, lyrics, headers={"ETag": etag})
 
 
 @router.post("/orders/{order_id}/lyrics/submit_edit")
 async def submit_lyrics_edit(
-    order_id: int,
     request: LyricsEditRequest,
-    current_user: User = Depends(AuthService.get_current_user),
+    order: OrderRef = Depends(get_owned_order),
     db: AsyncSession = Depends(get_db)
 ):
     """Submit edited lyrics."""
     order_service = OrderService(db)
     
-    order = await order_service.get_order_by_id(order_id)
-    
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    lyrics = await order_service.submit_lyrics_edit(order_id, request)
+    with transition_errors():
+        lyrics = await order_service.submit_lyrics_edit(order.id, request)
     
     return lyrics
 
 
-@router.post("/orders/{order_id}/approve")
+@router.post("/orders/{order_id}/approve", response_model=OrderResponse)
 async def approve_order(
-    order_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
+    order: OrderRef = Depends(get_owned_order),
     db: AsyncSession = Depends(get_db)
 ):
     """Approve order for processing."""
     order_service = OrderService(db)
     
-    order = await order_service.get_order_by_id(order_id)
-    
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    with transition_errors():
+        updated_order = await order_service.approve_order(order.id)
     
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    updated_order = await order_service.approve_order(order_id)
-    
-    return updated_order
+    return model_response(ORDER_RESPONSE_ADAPTER, updated_order)
 
 
 @router.post("/orders/{order_id}/pay")
 async def create_payment(
-    order_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
+    order: OrderRef = Depends(get_owned_order),
     db: AsyncSession = Depends(get_db)
 ):
     """Create payment for order."""
     order_service = OrderService(db)
     
-    order = await order_service.get_order_by_id(order_id)
-    
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    payment = await order_service.create_payment(order_id)
+    payment = await order_service.create_payment(order.id)
     
     return payment
 
 
 @router.post("/orders/{order_id}/generate_audio")
 async def generate_audio(
-    order_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
+    order: OrderRef = Depends(get_owned_order),
     db: AsyncSession = Depends(get_db)
 ):
     """Generate audio for order."""
     order_service = OrderService(db)
     
-    order = await order_service.get_order_by_id(order_id)
-    
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    task_id = await order_service.generate_audio(order_id)
+    with transition_errors():
+        task_id = await order_service.generate_audio(order.id)
     
     return {"task_id": task_id, "message": "Audio generation started"}
-
@@ -0,0 +1,174 @@
+"""Benchmark: BaseHTTPMiddleware stack vs pure ASGI middleware stack.
+
+Builds two copies of the app's middleware stack around a stub
+``GET /api/v1/orders`` handler (no database or auth) and reports
+requests per second for each. The rate limiter talks to the Redis
+configured in ``settings.redis_url``.
+
+Usage (from app/server):
+    python -m benchmarks.bench_middleware --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from core.metrics import REQUEST_COUNT, REQUEST_DURATION
+from core.middleware import LoggingMiddleware, PrometheusMiddleware, RateLimitMiddleware
+from core.redis import get_redis, redis_client
+
+
+ORDERS_PAYLOAD = {"items": [], "total": 0, "skip": 0, "limit": 20}
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """Previous ``BaseHTTPMiddleware`` logging middleware."""
+
+    async def dispatch(self, request: Request, call_next):
+        from core.middleware import logger
+
+        start_time = time.time()
+        trace_id = f"trace_{int(time.time() * 1000)}"
+        logger.info(
+            "Request started",
+            trace_id=trace_id,
+            method=request.method,
+            path=request.url.path,
+            query_params=dict(request.query_params),
+            user_agent=request.headers.get("user-agent"),
+            client_ip=request.client.host if request.client else None,
+        )
+        response = await call_next(request)
+        duration = time.time() - start_time
+        logger.info(
+            "Request completed",
+            trace_id=trace_id,
+            status_code=response.status_code,
+            duration_ms=round(duration * 1000, 2),
+        )
+        response.headers["X-Trace-ID"] = trace_id
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Previous ``BaseHTTPMiddleware`` rate limiting middleware."""
+
+    def __init__(self, app, calls: int, period: int = 60):
+        super().__init__(app)
+        self.calls = calls
+        self.period = period
+
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        key = f"rate_limit_legacy:ip:{client_ip}"
+        redis = await get_redis()
+        current = await redis.get(key)
+        current = int(current) if current else 0
+        if current >= self.calls:
+            return JSONResponse(status_code=429, content={"error_code": "RATE_LIMIT_EXCEEDED"})
+        pipe = redis.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, self.period)
+        await pipe.execute()
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(self.calls)
+        response.headers["X-RateLimit-Remaining"] = str(self.calls - current - 1)
+        return response
+
+
+def _base_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/orders")
+    async def list_orders():
+        return ORDERS_PAYLOAD
+
+    return app
+
+
+def build_legacy_app(calls: int) -> FastAPI:
+    """Build app with the previous middleware stack."""
+    app = _base_app()
+    app.add_middleware(LegacyRateLimitMiddleware, calls=calls)
+    app.add_middleware(LegacyLoggingMiddleware)
+
+    @app.middleware("http")
+    async def prometheus_middleware(request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        duration = time.time() - start_time
+        REQUEST_COUNT.labels(
+            method=request.method,
+            endpoint=request.url.path,
+            status=response.status_code
+        ).inc()
+        REQUEST_DURATION.labels(
+            method=request.method,
+            endpoint=request.url.path
+        ).observe(duration)
+        return response
+
+    return app
+
+
+def build_asgi_app(calls: int) -> FastAPI:
+    """Build app with the pure ASGI middleware stack."""
+    app = _base_app()
+    app.add_middleware(RateLimitMiddleware, calls=calls)
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> float:
+    """Send ``total`` requests and return requests per second."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing, Redis connection and metric children
+        for _ in range(50):
+            await client.get("/api/v1/orders")
+
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                response = await client.get("/api/v1/orders")
+                assert response.status_code == 200, response.status_code
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return total / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Make sure the limiter never rejects during the run
+    calls = 10 ** 9
+    redis = await get_redis()
+    await redis.delete("rate_limit:ip:127.0.0.1", "rate_limit_legacy:ip:127.0.0.1")
+
+    legacy_rps = await run(build_legacy_app(calls), args.requests, args.concurrency)
+    asgi_rps = await run(build_asgi_app(calls), args.requests, args.concurrency)
+    await redis_client.close()
+
+    print(f"BaseHTTPMiddleware stack: {legacy_rps:8.1f} req/s")
+    print(f"Pure ASGI stack:          {asgi_rps:8.1f} req/s")
+    print(f"Speedup:                  {asgi_rps / legacy_rps:8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
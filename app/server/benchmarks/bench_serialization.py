@@ -0,0 +1,113 @@
+"""Benchmark: order list serialization, standard path vs pre-built serializer.
+
+The standard path mirrors what FastAPI does for a ``response_model``:
+validate into the Pydantic model, convert with ``jsonable_encoder`` and
+render with ``json.dumps``. The fast path validates from attributes and
+dumps straight to JSON bytes with the pre-built ``TypeAdapter``.
+
+Usage (from app/server):
+    python -m benchmarks.bench_serialization --repeat 200
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from models.audio_asset import AudioKind, AudioStatus
+from models.lyrics_version import LyricsStatus
+from models.order import OrderLanguage, OrderStatus, PaymentStatus
+from schemas.order import ORDER_LIST_RESPONSE_ADAPTER, OrderListResponse
+
+LYRICS_TEXT = "\n".join(f"Строка песни номер {i}, про любовь и лето" for i in range(24))
+
+
+def make_order(order_id: int) -> SimpleNamespace:
+    """Build an ORM-like order with typical nested relations."""
+    now = datetime.utcnow()
+    return SimpleNamespace(
+        id=order_id,
+        status=OrderStatus.LYRICS_READY,
+        language=OrderLanguage.RU,
+        genre="pop",
+        mood="romantic",
+        tempo="medium",
+        occasion="birthday",
+        recipient="Айгерим",
+        notes="Упомянуть море и первое свидание",
+        price=Decimal("9.99"),
+        currency="USD",
+        payment_status=PaymentStatus.NONE,
+        created_at=now,
+        updated_at=now,
+        lyrics_versions=[
+            SimpleNamespace(
+                id=order_id * 10 + version,
+                version=version,
+                text=LYRICS_TEXT,
+                status=LyricsStatus.READY,
+                created_at=now,
+            )
+            for version in range(1, 4)
+        ],
+        audio_assets=[
+            SimpleNamespace(
+                id=order_id * 10 + n,
+                kind=AudioKind.FULL,
+                url=f"https://cdn.example.com/audio/{order_id}/{n}.mp3",
+                duration_sec=152.4,
+                status=AudioStatus.READY,
+                created_at=now,
+            )
+            for n in range(2)
+        ],
+    )
+
+
+def standard(orders) -> bytes:
+    model = OrderListResponse.model_validate(
+        {"items": orders, "total": len(orders), "skip": 0, "limit": len(orders)},
+        from_attributes=True,
+    )
+    content = jsonable_encoder(model)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def prebuilt(orders) -> bytes:
+    model = ORDER_LIST_RESPONSE_ADAPTER.validate_python(
+        {"items": orders, "total": len(orders), "skip": 0, "limit": len(orders)},
+        from_attributes=True,
+    )
+    return ORDER_LIST_RESPONSE_ADAPTER.dump_json(model)
+
+
+def per_order_us(func, orders, repeat: int) -> float:
+    func(orders)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(orders)
+    elapsed = time.perf_counter() - started
+    return elapsed / repeat / len(orders) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'orders':>6} {'standard us/order':>18} {'prebuilt us/order':>18} {'speedup':>8}")
+    for count in (1, 20, 100):
+        orders = [make_order(i) for i in range(1, count + 1)]
+        slow = per_order_us(standard, orders, args.repeat)
+        fast = per_order_us(prebuilt, orders, args.repeat)
+        print(f"{count:>6} {slow:>18.1f} {fast:>18.1f} {slow / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Check that hot order and lyrics queries use the composite indexes.
+
+Runs ``EXPLAIN (FORMAT JSON)`` for each query against the database in
+``settings.sync_database_url`` and exits non-zero if the expected index
+does not appear in the plan. Sequential scans are disabled for the check
+so that small development tables still exercise the indexes the planner
+would pick on production-sized data.
+
+Usage (from app/server, after ``alembic upgrade head``):
+    python -m benchmarks.check_query_plans
+"""
+
+import json
+import sys
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select
+
+from core.database import sync_engine
+from models.lyrics_version import LyricsVersion
+from models.order import Order, OrderStatus
+
+
+def hot_queries() -> List[Tuple[str, Select, str]]:
+    """Queries issued by OrderService/LyricsService and their expected index."""
+    return [
+        (
+            "order list",
+            select(Order)
+            .where(Order.user_id == 1)
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(21),
+            "ix_orders_user_id_created_at",
+        ),
+        (
+            "order list by status",
+            select(Order)
+            .where(Order.user_id == 1, Order.status == OrderStatus.LYRICS_READY)
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(21),
+            "ix_orders_user_id_status_created_at",
+        ),
+        (
+            "latest lyrics",
+            select(LyricsVersion)
+            .join(Order, Order.latest_lyrics_version_id == LyricsVersion.id)
+            .where(Order.id == 1),
+            "lyrics_versions_pkey",
+        ),
+        (
+            "lyrics versions of order",
+            select(LyricsVersion)
+            .where(LyricsVersion.order_id == 1)
+            .order_by(LyricsVersion.version),
+            "uq_lyrics_versions_order_id_version",
+        ),
+    ]
+
+
+def plan_indexes(plan: dict) -> Iterator[str]:
+    """Yield index names used anywhere in a JSON plan tree."""
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from plan_indexes(child)
+
+
+def main() -> int:
+    failures = 0
+
+    with sync_engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+
+        for name, query, expected in hot_queries():
+            sql = str(query.compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"literal_binds": True},
+            ))
+            raw = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            used = set(plan_indexes(plan))
+
+            if expected in used:
+                print(f"OK    {name}: {expected}")
+            else:
+                failures += 1
+                print(f"FAIL  {name}: expected {expected}, plan uses {sorted(used) or 'no index'}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
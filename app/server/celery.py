@@ -1,9 +1,11 @@
 """Celery configuration."""
 
 from celery import Celery
+from celery.signals import before_task_publish, task_prerun, task_postrun
 from kombu import Queue
 
 from core.config import settings
+from core.tracing import TRACE_HEADER, get_trace_id, new_trace_id, trace_context
 
 # Create Celery instance
 celery_app = Celery(
@@ -69,3 +71,37 @@ if not settings.debug:
         worker_log_color=False,
     )
 
+
+
+# Trace ID propagation: the publisher's trace ID rides in a message header
+# and is bound to the task context (and its log lines) while it runs
+_task_traces = {}
+
+
+@before_task_publish.connect
+def add_trace_header(headers=None, **kwargs):
+    """Forward current trace ID to the task."""
+    trace_id = get_trace_id()
+    if trace_id and headers is not None:
+        headers.setdefault(TRACE_HEADER, trace_id)
+
+
+@task_prerun.connect
+def bind_task_trace(task_id=None, task=None, **kwargs):
+    """Bind trace ID from message headers for the task's duration."""
+    trace_id = (
+        getattr(task.request, TRACE_HEADER, None)
+        or (task.request.headers or {}).get(TRACE_HEADER)
+        or new_trace_id()
+    )
+    context = trace_context(trace_id)
+    context.__enter__()
+    _task_traces[task_id] = context
+
+
+@task_postrun.connect
+def unbind_task_trace(task_id=None, **kwargs):
+    """Unbind trace ID after the task finishes."""
+    context = _task_traces.pop(task_id, None)
+    if context is not None:
+        context.__exit__(None, None, None)
@@ -0,0 +1,188 @@
+"""In-process and Redis caches."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+import orjson
+import structlog
+from redis.exceptions import NoScriptError
+
+from core.redis import get_redis
+
+logger = structlog.get_logger()
+
+_MISSING = object()
+
+
+class LocalTTLCache:
+    """Bounded LRU whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value if present and not expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entry if full."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """Remove value."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all values."""
+        self._entries.clear()
+
+
+class TieredCache:
+    """JSON values cached in-process first, then in Redis.
+
+    The local tier has a short TTL because other workers cannot invalidate
+    it; the Redis tier is shared and invalidated explicitly on writes.
+    Redis errors are logged and treated as misses.
+    """
+
+    def __init__(self, prefix: str, ttl: int, local_ttl: float, maxsize: int):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local = LocalTTLCache(maxsize, local_ttl)
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        """Get cached value or None."""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        try:
+            redis = await get_redis()
+            raw = await redis.get(self._key(key))
+        except Exception as e:
+            logger.warning("Cache read failed", prefix=self.prefix, error=str(e))
+            return None
+
+        if raw is None:
+            return None
+
+        value = orjson.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: Hashable, value: Any):
+        """Cache value in both tiers."""
+        self.local.set(key, value)
+        try:
+            redis = await get_redis()
+            await redis.set(self._key(key), orjson.dumps(value), ex=self.ttl)
+        except Exception as e:
+            logger.warning("Cache write failed", prefix=self.prefix, error=str(e))
+
+    async def delete(self, key: Hashable):
+        """Invalidate value in both tiers."""
+        self.local.delete(key)
+        try:
+            redis = await get_redis()
+            await redis.delete(self._key(key))
+        except Exception as e:
+            logger.warning("Cache invalidation failed", prefix=self.prefix, error=str(e))
+
+
+# Returns {version, value}; the value lives under KEYS[2] followed by the
+# current version, so one round trip reads both
+VERSIONED_GET_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+return {version, redis.call('GET', KEYS[2] .. version)}
+"""
+
+
+class VersionedCache:
+    """Redis cache whose entries are invalidated by bumping a version.
+
+    Values are stored under ``{prefix}:{{key}}:{version}``. Writers bump
+    the version after committing, so a reader that loaded stale data
+    before the bump can only store it under the old version, which is
+    never read again. The braces are a Redis Cluster hash tag keeping a
+    key's version and values in one slot. Redis errors are logged and
+    treated as misses.
+    """
+
+    def __init__(self, prefix: str, ttl: int):
+        self.prefix = prefix
+        self.ttl = ttl
+        # Versions outlive every value written under them, so an expired
+        # version never resurrects an old value
+        self.version_ttl = ttl * 2
+        self._sha: Optional[str] = None
+
+    def _version_key(self, key: Hashable) -> str:
+        return f"{self.prefix}:{{{key}}}:v"
+
+    def _value_key(self, key: Hashable, version: str) -> str:
+        return f"{self.prefix}:{{{key}}}:{version}"
+
+    async def _get(self, redis, key: Hashable) -> list:
+        if self._sha is None:
+            self._sha = await redis.script_load(VERSIONED_GET_SCRIPT)
+        keys = (self._version_key(key), self._value_key(key, ""))
+        try:
+            return await redis.evalsha(self._sha, 2, *keys)
+        except NoScriptError:
+            # Script cache was flushed (Redis restart or SCRIPT FLUSH)
+            self._sha = await redis.script_load(VERSIONED_GET_SCRIPT)
+            return await redis.evalsha(self._sha, 2, *keys)
+
+    async def get(self, key: Hashable) -> Tuple[Optional[str], Optional[str]]:
+        """Get current version and cached value (None on a miss)."""
+        try:
+            redis = await get_redis()
+            version, value = await self._get(redis, key)
+        except Exception as e:
+            logger.warning("Cache read failed", prefix=self.prefix, error=str(e))
+            return None, None
+        return version, value
+
+    async def set(self, key: Hashable, version: Optional[str], value: str):
+        """Cache value under the version returned by ``get``."""
+        if version is None:
+            return
+        try:
+            redis = await get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._value_key(key, version), value, ex=self.ttl)
+                pipe.expire(self._version_key(key), self.version_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Cache write failed", prefix=self.prefix, error=str(e))
+
+    async def bump(self, *keys: Hashable):
+        """Invalidate cached values of ``keys``."""
+        if not keys:
+            return
+        try:
+            redis = await get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.incr(self._version_key(key))
+                    pipe.expire(self._version_key(key), self.version_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Cache invalidation failed", prefix=self.prefix, error=str(e))
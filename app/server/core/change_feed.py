@@ -0,0 +1,157 @@
+"""Cross-instance order change feed.
+
+A trigger (migration 0003) sends a compact ``NOTIFY order_changes`` when
+an order is created or its status changes. Each API process keeps one
+dedicated ``LISTEN`` connection and fans changes out to in-process
+listeners such as caches and event streams. When the connection drops,
+the feed reconnects and backfills changes missed in between from the
+indexed ``orders.status_changed_at``; listeners may therefore see a
+change twice and must be idempotent.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, List, NamedTuple, Optional
+
+import asyncpg
+import orjson
+import structlog
+from sqlalchemy.engine import make_url
+
+from core.config import settings
+from models.order import OrderStatus
+
+logger = structlog.get_logger()
+
+CHANNEL = "order_changes"
+
+BACKFILL_QUERY = """
+    SELECT id, user_id, status, status_changed_at
+    FROM orders
+    WHERE status_changed_at >= $1
+    ORDER BY status_changed_at
+"""
+
+
+class OrderChange(NamedTuple):
+    """Order status change."""
+    order_id: int
+    user_id: int
+    status: OrderStatus
+    changed_at: datetime
+
+
+OrderChangeListener = Callable[[OrderChange], None]
+
+
+def _listen_dsn() -> str:
+    """Plain PostgreSQL DSN for asyncpg."""
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class OrderChangeFeed:
+    """Shared ``LISTEN`` connection fanning order changes out to listeners."""
+
+    def __init__(
+        self,
+        reconnect_delay: float = None,
+        backfill_margin: float = None,
+        health_interval: float = None,
+    ):
+        self.reconnect_delay = reconnect_delay or settings.change_feed_reconnect_delay
+        self.health_interval = health_interval or settings.change_feed_health_interval
+        self.backfill_margin = timedelta(
+            seconds=backfill_margin if backfill_margin is not None else settings.change_feed_backfill_margin
+        )
+        self._listeners: List[OrderChangeListener] = []
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: OrderChangeListener):
+        """Call ``listener`` with every order change."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: OrderChangeListener):
+        """Stop calling ``listener``."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def start(self):
+        """Start listening in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop listening."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def dispatch(self, change: OrderChange):
+        """Deliver a change to all listeners."""
+        if self._watermark is None or change.changed_at > self._watermark:
+            self._watermark = change.changed_at
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception as e:
+                logger.error("Order change listener failed", order_id=change.order_id, error=str(e))
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        data = orjson.loads(payload)
+        self.dispatch(OrderChange(
+            order_id=data["id"],
+            user_id=data["u"],
+            status=OrderStatus[data["s"]],
+            changed_at=datetime.fromisoformat(data["t"]),
+        ))
+
+    async def _backfill(self, connection: asyncpg.Connection):
+        """Replay changes missed while disconnected."""
+        rows = await connection.fetch(BACKFILL_QUERY, self._watermark - self.backfill_margin)
+        for row in rows:
+            self.dispatch(OrderChange(row["id"], row["user_id"], OrderStatus[row["status"]], row["status_changed_at"]))
+        logger.info("Order change feed backfilled", changes=len(rows))
+
+    async def _run(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(_listen_dsn())
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+
+                # Listen first, then backfill, so nothing falls in between
+                if self._watermark is not None:
+                    await self._backfill(connection)
+                else:
+                    self._watermark = datetime.utcnow()
+                logger.info("Order change feed listening")
+
+                # A half-open TCP connection never reports termination,
+                # so probe it while idle
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), self.health_interval)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1", timeout=self.health_interval)
+                logger.warning("Order change feed connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Order change feed failed", error=str(e))
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+
+# Global order change feed instance
+order_changes = OrderChangeFeed()
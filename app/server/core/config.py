@@ -1,7 +1,7 @@
 """Application configuration."""
 
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseSettings, validator
 
 
@@ -13,11 +13,22 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     debug: bool = False
     log_level: str = "INFO"
+    log_queue_size: int = 10000
+    log_sample_rate: float = 0.1  # share of fast successful requests logged
+    log_slow_request_ms: int = 1000
+    log_summary_interval: int = 60  # seconds between request count summaries
     
     # ====== SECURITY ======
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 60 * 24 * 7  # 7 days
+    jwt_cache_size: int = 10000
+    # Embed profile fields (without phone) in access tokens and trust them
+    # on read-only routes
+    auth_trust_token_claims: bool = False
+    user_cache_ttl: int = 300  # seconds, Redis tier
+    user_cache_local_ttl: int = 15  # seconds, in-process tier
+    user_cache_size: int = 10000
     cors_origins: List[str] = ["http://localhost:3000"]
     
     # ====== DATABASE ======
@@ -43,13 +54,21 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
     
+    change_feed_reconnect_delay: float = 1.0  # seconds
+    change_feed_backfill_margin: float = 5.0  # seconds of clock skew to re-read
+    change_feed_health_interval: float = 30.0  # seconds
+    
     # ====== REDIS ======
     redis_url: str = "redis://localhost:6379/0"
+    order_events_queue_size: int = 100  # pending events per stream
+    order_events_keepalive_seconds: int = 15
+    order_events_token_ttl: int = 60  # seconds a ?token= stream token is valid
     
     # ====== TELEGRAM ======
     telegram_bot_token: str
     telegram_bot_webhook_secret: str
     telegram_webhook_url: Optional[str] = None
+    telegram_auth_max_age: int = 60 * 60 * 24  # seconds initData stays valid
     
     # ====== AI ======
     openai_api_key: str
@@ -81,11 +100,33 @@ class Settings(BaseSettings):
     # ====== BUSINESS RULES ======
     max_free_regenerations: int = 3
     asset_retention_days: int = 180
+    order_count_cache_ttl: int = 30  # seconds
+    order_cache_ttl: int = 600  # seconds
+    bootstrap_orders_limit: int = 20
     rate_limit_per_minute: int = 30
+    rate_limit_sync_interval_ms: int = 250
+    rate_limit_local_max_keys: int = 10000
+    rate_limit_sync_threshold: float = 0.2
+    rate_limit_workers: int = 1  # API processes sharing each limit
+    # Quota units per call for expensive routes, "METHOD /path/{param}": cost
+    rate_limit_route_costs: Dict[str, int] = {
+        "POST /api/v1/orders/{order_id}/lyrics/generate": 5,
+        "POST /api/v1/orders/{order_id}/generate_audio": 10,
+    }
     
     # ====== OBSERVABILITY ======
     sentry_dsn: Optional[str] = None
     prometheus_enabled: bool = True
+    prometheus_duration_buckets: List[float] = [
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+    ]
+    prometheus_generation_buckets: List[float] = [
+        0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+    ]
+    prometheus_generation_endpoints: List[str] = [
+        "/api/v1/orders/{order_id}/lyrics/generate",
+        "/api/v1/orders/{order_id}/generate_audio",
+    ]
     
     @validator("cors_origins", pre=True)
     def parse_cors_origins(cls, v):
@@ -0,0 +1,35 @@
+"""Entity tags for conditional GET."""
+
+import hashlib
+from typing import Any, Optional
+
+from starlette.responses import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values that determine a response."""
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an ``If-None-Match`` header value against ``etag``.
+
+    Uses weak comparison, as RFC 9110 requires for ``If-None-Match``.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Build a ``304 Not Modified`` response."""
+    return Response(status_code=304, headers={"ETag": etag})
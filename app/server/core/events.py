@@ -0,0 +1,135 @@
+"""Live order events.
+
+Celery tasks publish progress steps to a Redis pub/sub channel per order;
+status changes arrive from the order change feed. Each API process keeps
+a single pattern subscription and fans events out to in-process
+subscribers, so open event streams do not hold a Redis connection each.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+import orjson
+import redis.asyncio as redis
+import structlog
+
+from core.config import settings
+from core.redis import get_redis
+
+logger = structlog.get_logger()
+
+ORDER_EVENTS_PREFIX = "order_events:"
+
+
+def order_channel(order_id: int) -> str:
+    """Get pub/sub channel of an order."""
+    return f"{ORDER_EVENTS_PREFIX}{order_id}"
+
+
+async def publish_order_event(order_id: int, event: str, **data: Any):
+    """Publish an order event; failures are logged, never raised."""
+    payload = orjson.dumps({"event": event, "order_id": order_id, **data})
+    try:
+        client = await get_redis()
+        await client.publish(order_channel(order_id), payload)
+    except Exception as e:
+        logger.warning("Order event publish failed", order_id=order_id, event=event, error=str(e))
+
+
+async def report_progress(task, order_id: int, current: int, total: int, status: str):
+    """Record Celery task progress and publish it as an order event."""
+    task.update_state(
+        state="PROGRESS",
+        meta={"current": current, "total": total, "status": status}
+    )
+    await publish_order_event(order_id, "progress", current=current, total=total, message=status)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> bytes:
+    """Render a Server-Sent Events message."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+class OrderEventHub:
+    """Fans order events from one Redis subscription out to local queues.
+
+    A slow subscriber never blocks the others: when its queue is full
+    the oldest pending event is dropped.
+    """
+
+    def __init__(self, queue_size: int = None):
+        self.queue_size = queue_size or settings.order_events_queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, client: redis.Redis):
+        """Start the shared subscription."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(client))
+
+    async def stop(self):
+        """Stop the shared subscription."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def subscribe(self, order_id: int) -> asyncio.Queue:
+        """Get a queue receiving events of an order."""
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers[order_id].add(queue)
+        return queue
+
+    def unsubscribe(self, order_id: int, queue: asyncio.Queue):
+        """Stop delivering events to a queue."""
+        queues = self._subscribers.get(order_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[order_id]
+
+    def dispatch(self, order_id: int, event: Dict[str, Any]):
+        """Deliver an event to local subscribers of an order."""
+        for queue in self._subscribers.get(order_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def on_order_change(self, change):
+        """Relay a change from the order change feed as a status event."""
+        self.dispatch(change.order_id, {
+            "event": "status",
+            "order_id": change.order_id,
+            "status": change.status.value,
+        })
+
+    async def _listen(self, client: redis.Redis):
+        while True:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{ORDER_EVENTS_PREFIX}*")
+                while True:
+                    # Poll with a timeout so the client's socket timeout
+                    # does not fire on an idle channel
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    event = orjson.loads(message["data"])
+                    self.dispatch(int(event["order_id"]), event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Order event subscription failed", error=str(e))
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+
+
+# Global order event hub instance
+order_events = OrderEventHub()
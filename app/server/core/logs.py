@@ -0,0 +1,145 @@
+"""Structured logging configuration.
+
+Log calls on the event loop only build the event dict and push it onto a
+bounded queue. A background thread renders events to JSON with ``orjson``
+and writes them to stdout in batches. When the queue is full (stdout is
+slower than the request rate) records are dropped and counted instead of
+blocking requests. Once the sink is stopped at shutdown, records are
+written synchronously so late ones are not lost.
+"""
+
+import logging
+import queue
+import sys
+import threading
+from typing import Any, BinaryIO, Dict, Optional
+
+import orjson
+import structlog
+
+from core.config import settings
+from core.metrics import LOG_RECORDS_DROPPED
+
+_STOP = object()
+
+
+class QueueLogSink:
+    """Final structlog processor that hands events to a writer thread."""
+
+    def __init__(self, stream: BinaryIO = None, maxsize: int = None, batch_size: int = 256):
+        self.stream = stream or sys.stdout.buffer
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize or settings.log_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def __call__(self, logger, method_name: str, event_dict: Dict[str, Any]):
+        """Enqueue event without rendering it."""
+        if self._stopped:
+            self._write([event_dict])
+            raise structlog.DropEvent
+        try:
+            self._queue.put_nowait(event_dict)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+        raise structlog.DropEvent
+
+    def start(self):
+        """Start the writer thread."""
+        if self._thread is not None:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Flush queued events and stop the writer thread."""
+        if self._thread is None:
+            return
+        # From here on, records bypass the queue
+        self._stopped = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                return
+
+            # Drain whatever else is waiting and write it in one call
+            batch = [event]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    stop = True
+                    break
+                batch.append(event)
+
+            self._write(batch)
+
+            if stop:
+                return
+
+    def _write(self, batch: list):
+        try:
+            self.stream.write(b"".join(self._render(event) for event in batch))
+            self.stream.flush()
+        except Exception:
+            # Never let a broken stdout kill the writer thread
+            self.dropped += len(batch)
+            LOG_RECORDS_DROPPED.inc(len(batch))
+
+    @staticmethod
+    def _render(event_dict: Dict[str, Any]) -> bytes:
+        """Render event to a JSON line."""
+        try:
+            return orjson.dumps(
+                event_dict,
+                default=str,
+                option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            return orjson.dumps(
+                {str(key): str(value) for key, value in event_dict.items()},
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+
+
+# Global log sink instance
+log_sink = QueueLogSink()
+
+
+def configure_logging():
+    """Configure structlog to log through the queue sink."""
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            log_sink,
+        ],
+        context_class=dict,
+        # Only provides the logger name; the sink drops every event
+        # before it reaches the stdlib logger
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.make_filtering_bound_logger(
+            logging.getLevelName(settings.log_level.upper())
+        ),
+        cache_logger_on_first_use=True,
+    )
+    log_sink.start()
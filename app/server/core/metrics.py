@@ -0,0 +1,71 @@
+"""Prometheus metrics.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set before the process starts,
+``prometheus_client`` writes samples to per-process files in that directory
+and ``/metrics`` aggregates them, so the endpoint reports correct totals
+no matter which worker serves the scrape.
+"""
+
+import os
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+
+from core.config import settings
+
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "endpoint", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration",
+    ["method", "endpoint"],
+    buckets=settings.prometheus_duration_buckets,
+)
+GENERATION_REQUEST_DURATION = Histogram(
+    "http_generation_request_duration_seconds",
+    "HTTP request duration of lyrics and audio generation endpoints",
+    ["method", "endpoint"],
+    buckets=settings.prometheus_generation_buckets,
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full"
+)
+
+ORDER_CACHE_REQUESTS = Counter(
+    "order_cache_requests_total",
+    "Order detail cache lookups",
+    ["result"]
+)
+ORDER_CACHE_HITS = ORDER_CACHE_REQUESTS.labels(result="hit")
+ORDER_CACHE_MISSES = ORDER_CACHE_REQUESTS.labels(result="miss")
+
+SINGLE_FLIGHT_COALESCED = Counter(
+    "single_flight_coalesced_total",
+    "Calls that joined an identical in-flight call instead of running",
+    ["name"]
+)
+
+GENERATION_ENDPOINTS = frozenset(settings.prometheus_generation_endpoints)
+
+# Label for requests that matched no route, so unknown paths
+# cannot create new time series
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+
+def is_multiprocess() -> bool:
+    """Check whether multiprocess mode is enabled."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> bytes:
+    """Render metrics in Prometheus text format."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -1,123 +1,335 @@
-"""Custom middleware for the application."""
+"""Custom middleware for the application.
 
+All middleware here is written as plain ASGI callables rather than
+``BaseHTTPMiddleware`` subclasses, so the response is streamed straight
+through without an extra task and memory stream per layer.
+"""
+
+import random
+import re
 import time
 import structlog
-from typing import Dict, Optional
-from fastapi import Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, List, Optional, Pattern, Tuple
+from starlette.datastructures import MutableHeaders, QueryParams
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from core.config import settings
+from core.metrics import (
+    GENERATION_ENDPOINTS,
+    GENERATION_REQUEST_DURATION,
+    REQUEST_COUNT,
+    REQUEST_DURATION,
+    UNMATCHED_ENDPOINT,
+)
+from core.rate_limit import rate_limiter
 from core.redis import get_redis
+from core.security import get_bearer_token, token_cache
+from core.tracing import new_trace_id, trace_context, trace_id_from_traceparent
 
 logger = structlog.get_logger()
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Structured logging middleware."""
-    
-    async def dispatch(self, request: Request, call_next):
+def _client_ip(scope: Scope) -> Optional[str]:
+    """Get client IP from ASGI scope."""
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    """Get a single request header from ASGI scope."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class PrometheusMiddleware:
+    """Prometheus metrics middleware.
+
+    Requests are labelled with the matched route template (for example
+    ``/api/v1/orders/{order_id}``) rather than the raw path, which the
+    router leaves in ``scope["route"]`` once the request is handled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Record request count and duration."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Record metrics, also for unhandled exceptions (as 500)
+            duration = time.time() - start_time
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or UNMATCHED_ENDPOINT
+
+            REQUEST_COUNT.labels(
+                method=scope["method"],
+                endpoint=endpoint,
+                status=status_code
+            ).inc()
+
+            REQUEST_DURATION.labels(
+                method=scope["method"],
+                endpoint=endpoint
+            ).observe(duration)
+
+            if endpoint in GENERATION_ENDPOINTS:
+                GENERATION_REQUEST_DURATION.labels(
+                    method=scope["method"],
+                    endpoint=endpoint
+                ).observe(duration)
+
+
+class LoggingMiddleware:
+    """Structured logging middleware.
+
+    One "Request completed" line is written per logged request. Fast
+    successful requests are sampled at ``sample_rate``; errors, slow
+    requests and rate-limit rejections are always logged. Exact counts of
+    all requests are kept in memory and emitted as a periodic summary
+    line, so sampled totals can be scaled back up.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = None,
+        slow_request_ms: int = None,
+        summary_interval: int = None,
+    ):
+        self.app = app
+        self.sample_rate = (
+            sample_rate if sample_rate is not None else settings.log_sample_rate
+        )
+        self.slow_request_ms = slow_request_ms or settings.log_slow_request_ms
+        self.summary_interval = summary_interval or settings.log_summary_interval
+        self.counters: Dict[str, int] = dict.fromkeys(
+            ("total", "logged", "sampled_out", "errors", "slow", "rate_limited"), 0
+        )
+        self._last_summary = time.monotonic()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Log request and response."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        
-        # Generate trace ID
-        trace_id = f"trace_{int(time.time() * 1000)}"
-        
-        # Log request
-        logger.info(
-            "Request started",
-            trace_id=trace_id,
-            method=request.method,
-            path=request.url.path,
-            query_params=dict(request.query_params),
-            user_agent=request.headers.get("user-agent"),
-            client_ip=request.client.host if request.client else None,
+
+        # Continue the caller's trace or start a new one
+        trace_id = (
+            trace_id_from_traceparent(_header(scope, b"traceparent"))
+            or new_trace_id()
         )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            "Request completed",
-            trace_id=trace_id,
-            status_code=response.status_code,
-            duration_ms=round(duration * 1000, 2),
+
+        with trace_context(trace_id):
+            logger.debug(
+                "Request started",
+                method=scope["method"],
+                path=scope["path"],
+            )
+
+            status_code = 500
+
+            async def send_wrapper(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    # Add trace ID to response headers
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Trace-ID"] = trace_id
+                await send(message)
+
+            # Process request
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Calculate duration; unhandled exceptions are logged as 500
+                duration_ms = round((time.time() - start_time) * 1000, 2)
+
+                self._log_completed(scope, status_code, duration_ms)
+
+    def _log_completed(self, scope: Scope, status_code: int, duration_ms: float):
+        """Count request and log it if it is kept by sampling."""
+        counters = self.counters
+        counters["total"] += 1
+
+        slow = duration_ms >= self.slow_request_ms
+        if status_code == 429:
+            counters["rate_limited"] += 1
+        elif status_code >= 400:
+            counters["errors"] += 1
+        if slow:
+            counters["slow"] += 1
+
+        always = slow or status_code >= 400
+        if always or random.random() < self.sample_rate:
+            counters["logged"] += 1
+            if status_code >= 500:
+                log = logger.error
+            elif always:
+                log = logger.warning
+            else:
+                log = logger.info
+
+            # Log response
+            log(
+                "Request completed",
+                method=scope["method"],
+                path=scope["path"],
+                query_params=dict(QueryParams(scope.get("query_string", b""))),
+                user_agent=_header(scope, b"user-agent"),
+                client_ip=_client_ip(scope),
+                status_code=status_code,
+                duration_ms=duration_ms,
+                sample_rate=1.0 if always else self.sample_rate,
+            )
+        else:
+            counters["sampled_out"] += 1
+
+        now = time.monotonic()
+        if now - self._last_summary >= self.summary_interval:
+            logger.info(
+                "Request log summary",
+                interval_s=round(now - self._last_summary, 1),
+                sample_rate=self.sample_rate,
+                **counters,
+            )
+            for key in counters:
+                counters[key] = 0
+            self._last_summary = now
+
+
+def _compile_route_costs(route_costs: Dict[str, int]) -> List[Tuple[str, Pattern, int]]:
+    """Compile ``"METHOD /path/{param}"`` cost patterns."""
+    compiled = []
+    for route, cost in route_costs.items():
+        method, _, path = route.partition(" ")
+        regex = "/".join(
+            "[^/]+" if segment.startswith("{") else re.escape(segment)
+            for segment in path.split("/")
         )
-        
-        # Add trace ID to response headers
-        response.headers["X-Trace-ID"] = trace_id
-        
-        return response
-
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware."""
-    
-    def __init__(self, app, calls: int = None, period: int = 60):
-        super().__init__(app)
+        compiled.append((method.upper(), re.compile(f"^{regex}$"), cost))
+    return compiled
+
+
+class RateLimitMiddleware:
+    """Rate limiting middleware.
+
+    Limits are keyed by the user ID from a valid bearer token, falling
+    back to the client IP for anonymous requests. Routes listed in
+    ``route_costs`` consume more than one unit of quota per call.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = None,
+        period: int = 60,
+        route_costs: Dict[str, int] = None,
+    ):
+        self.app = app
         self.calls = calls or settings.rate_limit_per_minute
         self.period = period
-    
-    async def dispatch(self, request: Request, call_next):
+        self.route_costs = _compile_route_costs(
+            route_costs if route_costs is not None else settings.rate_limit_route_costs
+        )
+
+    def _cost(self, method: str, path: str) -> int:
+        """Get quota cost of a request."""
+        for route_method, pattern, cost in self.route_costs:
+            if route_method == method and pattern.match(path):
+                return cost
+        return 1
+
+    def _user_id(self, scope: Scope) -> Optional[int]:
+        """Get user ID from the bearer token, if any."""
+        token = get_bearer_token(_header(scope, b"authorization"))
+        if token is None:
+            return None
+        claims = token_cache.decode(token)
+        return claims.user_id if claims else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Apply rate limiting."""
         # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/metrics"]:
-            return await call_next(request)
-        
+        if scope["type"] != "http" or scope["path"] in ["/health", "/metrics"]:
+            await self.app(scope, receive, send)
+            return
+
         # Get client identifier
-        client_ip = request.client.host if request.client else "unknown"
-        user_id = getattr(request.state, "user_id", None)
+        client_ip = _client_ip(scope) or "unknown"
+        user_id = self._user_id(scope)
+        if user_id is not None:
+            scope.setdefault("state", {})["user_id"] = user_id
         identifier = f"user:{user_id}" if user_id else f"ip:{client_ip}"
-        
+
         # Check rate limit
-        redis = await get_redis()
         key = f"rate_limit:{identifier}"
-        
+        cost = self._cost(scope["method"], scope["path"])
+
         try:
-            # Get current count
-            current = await redis.get(key)
-            current = int(current) if current else 0
-            
-            if current >= self.calls:
-                logger.warning(
-                    "Rate limit exceeded",
-                    identifier=identifier,
-                    current=current,
-                    limit=self.calls,
-                )
-                
-                return JSONResponse(
-                    status_code=429,
-                    content={
-                        "error_code": "RATE_LIMIT_EXCEEDED",
-                        "message": f"Rate limit exceeded. Maximum {self.calls} requests per {self.period} seconds.",
-                    },
-                    headers={
-                        "Retry-After": str(self.period),
-                        "X-RateLimit-Limit": str(self.calls),
-                        "X-RateLimit-Remaining": "0",
-                    }
-                )
-            
-            # Increment counter
-            pipe = redis.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, self.period)
-            await pipe.execute()
-            
-            # Add rate limit headers
-            response = await call_next(request)
-            response.headers["X-RateLimit-Limit"] = str(self.calls)
-            response.headers["X-RateLimit-Remaining"] = str(self.calls - current - 1)
-            
-            return response
-            
+            redis = await get_redis()
+            result = await rate_limiter.hit(redis, key, self.calls, self.period, cost)
         except Exception as e:
             logger.error("Rate limit check failed", error=str(e))
             # If Redis is down, allow the request
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+
+        if not result.allowed:
+            logger.warning(
+                "Rate limit exceeded",
+                identifier=identifier,
+                cost=cost,
+                limit=result.limit,
+                reset=result.reset,
+            )
+
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "error_code": "RATE_LIMIT_EXCEEDED",
+                    "message": f"Rate limit exceeded. Maximum {self.calls} requests per {self.period} seconds.",
+                },
+                headers={
+                    "Retry-After": str(result.reset),
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": str(result.reset),
+                }
+            )
+            await response(scope, receive, send)
+            return
+
+        rate_limit_headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": str(result.reset),
+        }
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                # Add rate limit headers
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers.items():
+                    headers[name] = value
+            await send(message)
 
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,316 @@
+"""Redis-backed sliding window rate limiter."""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import redis.asyncio as redis
+import structlog
+from redis.exceptions import NoScriptError
+
+from core.config import settings
+
+logger = structlog.get_logger()
+
+
+# Sliding window counter: the previous fixed window is weighted by how much
+# of it still overlaps the sliding window. Check and update happen in one
+# script call, so concurrent requests cannot race past the limit. State is
+# one hash per identifier: w = current window start (ms), c = current window
+# count, p = previous window count. ARGV[4] is usage already admitted
+# locally by a worker, recorded unconditionally before the check.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2]) * 1000
+local cost = tonumber(ARGV[3])
+local pending = tonumber(ARGV[4]) or 0
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = now - (now % period)
+
+local state = redis.call('HMGET', key, 'w', 'c', 'p')
+local w = tonumber(state[1]) or window
+local curr = tonumber(state[2]) or 0
+local prev = tonumber(state[3]) or 0
+
+if w ~= window then
+    if w == window - period then
+        prev = curr
+    else
+        prev = 0
+    end
+    curr = 0
+end
+
+curr = curr + pending
+
+local elapsed = now - window
+local used = prev * (period - elapsed) / period + curr
+local allowed = 0
+
+if used + cost <= limit then
+    allowed = 1
+    curr = curr + cost
+    used = used + cost
+end
+
+redis.call('HSET', key, 'w', window, 'c', curr, 'p', prev)
+redis.call('PEXPIRE', key, period * 2)
+
+local remaining = math.max(0, math.floor(limit - used))
+local reset = math.ceil((period - elapsed) / 1000)
+
+return {allowed, limit, remaining, reset}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Rate limit decision."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+
+
+class RateLimiter:
+    """Atomic sliding window rate limiter executed as a Redis script."""
+
+    def __init__(self):
+        self._sha: Optional[str] = None
+
+    async def load(self, client: redis.Redis) -> str:
+        """Load the script into Redis and remember its SHA."""
+        self._sha = await client.script_load(SLIDING_WINDOW_SCRIPT)
+        return self._sha
+
+    async def hit(
+        self,
+        client: redis.Redis,
+        key: str,
+        limit: int,
+        period: int,
+        cost: int = 1,
+        pending: int = 0,
+    ) -> RateLimitResult:
+        """Check and consume ``cost`` units of quota in one round trip."""
+        if self._sha is None:
+            await self.load(client)
+
+        try:
+            result = await client.evalsha(self._sha, 1, key, limit, period, cost, pending)
+        except NoScriptError:
+            # Script cache was flushed (Redis restart or SCRIPT FLUSH)
+            await self.load(client)
+            result = await client.evalsha(self._sha, 1, key, limit, period, cost, pending)
+
+        return _to_result(result)
+
+    async def record_many(
+        self,
+        client: redis.Redis,
+        entries: List[Tuple[str, int, int, int]],
+    ) -> List[RateLimitResult]:
+        """Record ``(key, limit, period, pending)`` usage in one pipeline."""
+        if self._sha is None:
+            await self.load(client)
+
+        async def execute():
+            pipe = client.pipeline(transaction=False)
+            for key, limit, period, pending in entries:
+                pipe.evalsha(self._sha, 1, key, limit, period, 0, pending)
+            return await pipe.execute()
+
+        try:
+            results = await execute()
+        except NoScriptError:
+            await self.load(client)
+            results = await execute()
+
+        return [_to_result(result) for result in results]
+
+
+def _to_result(result) -> RateLimitResult:
+    allowed, limit, remaining, reset = (int(value) for value in result)
+    return RateLimitResult(bool(allowed), limit, remaining, reset)
+
+
+class _LocalBucket:
+    """Per-identifier quota cached in this worker."""
+
+    __slots__ = ("limit", "period", "tokens", "pending", "reset_at")
+
+    def __init__(self, limit: int, period: int):
+        self.limit = limit
+        self.period = period
+        self.tokens = 0
+        self.pending = 0
+        self.reset_at = 0.0
+
+
+class TwoTierRateLimiter:
+    """In-process token buckets in front of the Redis rate limiter.
+
+    Each worker admits requests from a local bucket refilled with the
+    global remaining quota reported by Redis, and pushes the usage it
+    admitted to Redis in batches every ``sync_interval_ms``. Requests go
+    to Redis synchronously only for unknown identifiers, after the window
+    resets, or once the local bucket drops below ``sync_threshold`` of the
+    limit, so global limits stay close to exact across workers.
+
+    The remaining quota is shared by ``workers`` processes, so each one
+    only admits its share locally; together they cannot overshoot the
+    global limit between syncs.
+    """
+
+    def __init__(
+        self,
+        sync_interval_ms: int = None,
+        max_keys: int = None,
+        sync_threshold: float = None,
+        workers: int = None,
+    ):
+        self.redis_limiter = RateLimiter()
+        self.sync_interval = (sync_interval_ms or settings.rate_limit_sync_interval_ms) / 1000
+        self.max_keys = max_keys or settings.rate_limit_local_max_keys
+        self.sync_threshold = (
+            sync_threshold if sync_threshold is not None else settings.rate_limit_sync_threshold
+        )
+        self.workers = max(1, workers or settings.rate_limit_workers)
+        self._buckets: "OrderedDict[str, _LocalBucket]" = OrderedDict()
+        self._evicted: Dict[str, Tuple[int, int, int]] = {}
+        self._client: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, client: redis.Redis):
+        """Load the Redis script and start the background sync task."""
+        self._client = client
+        await self.redis_limiter.load(client)
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        """Stop the sync task and flush outstanding usage."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("Rate limit sync failed", error=str(e))
+
+    async def hit(
+        self,
+        client: redis.Redis,
+        key: str,
+        limit: int,
+        period: int,
+        cost: int = 1,
+    ) -> RateLimitResult:
+        """Check and consume ``cost`` units of quota."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            if (
+                self._task is not None
+                and now < bucket.reset_at
+                and bucket.tokens - cost >= bucket.limit * self.sync_threshold / self.workers
+            ):
+                bucket.tokens -= cost
+                bucket.pending += cost
+                return RateLimitResult(
+                    True, bucket.limit, bucket.tokens, math.ceil(bucket.reset_at - now)
+                )
+        else:
+            bucket = self._add_bucket(key, limit, period)
+
+        # Near quota or no fresh global view: ask Redis, folding in any
+        # locally admitted usage instead of leaving it for the sync task.
+        # Take it off the bucket before awaiting so a concurrent flush
+        # cannot send it again.
+        pending = bucket.pending
+        bucket.pending = 0
+        try:
+            result = await self.redis_limiter.hit(client, key, limit, period, cost, pending)
+        except Exception:
+            bucket.pending += pending
+            raise
+        self._apply(bucket, result, time.monotonic())
+        return result
+
+    async def flush(self):
+        """Push locally admitted usage to Redis in one pipeline."""
+        if self._client is None:
+            return
+
+        # Take pending usage off the buckets before awaiting, so usage
+        # admitted or sent by a concurrent hit is never counted twice
+        entries = []
+        for key, bucket in self._buckets.items():
+            if bucket.pending:
+                entries.append((key, bucket.limit, bucket.period, bucket.pending))
+                bucket.pending = 0
+        entries.extend(
+            (key, limit, period, pending)
+            for key, (limit, period, pending) in self._evicted.items()
+        )
+        self._evicted.clear()
+        if not entries:
+            return
+
+        try:
+            results = await self.redis_limiter.record_many(self._client, entries)
+        except Exception:
+            # Put the usage back for the next attempt
+            for key, limit, period, pending in entries:
+                self._restore(key, limit, period, pending)
+            raise
+
+        now = time.monotonic()
+        for (key, _, _, _), result in zip(entries, results):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._apply(bucket, result, now)
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Rate limit sync failed", error=str(e))
+
+    def _add_bucket(self, key: str, limit: int, period: int) -> _LocalBucket:
+        bucket = _LocalBucket(limit, period)
+        self._buckets[key] = bucket
+        while len(self._buckets) > self.max_keys:
+            evicted_key, evicted = self._buckets.popitem(last=False)
+            if evicted.pending:
+                self._restore(evicted_key, evicted.limit, evicted.period, evicted.pending)
+        return bucket
+
+    def _restore(self, key: str, limit: int, period: int, pending: int):
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pending += pending
+        else:
+            _, _, evicted = self._evicted.get(key, (limit, period, 0))
+            self._evicted[key] = (limit, period, evicted + pending)
+
+    def _apply(self, bucket: _LocalBucket, result: RateLimitResult, now: float):
+        # Usage admitted while the call was in flight is still pending
+        bucket.limit = result.limit
+        bucket.tokens = result.remaining // self.workers - bucket.pending
+        bucket.reset_at = now + result.reset
+
+
+# Global rate limiter instance
+rate_limiter = TwoTierRateLimiter()
@@ -0,0 +1,26 @@
+"""Response helpers."""
+
+from typing import Any, Mapping, Optional
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+
+class PrebuiltJSONResponse(Response):
+    """JSON response whose body was already serialized."""
+    media_type = "application/json"
+
+
+def model_response(
+    adapter: TypeAdapter,
+    value: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Validate ``value`` (ORM object or dict) and serialize it in one pass.
+
+    Uses the adapter's compiled pydantic-core serializer to produce JSON
+    bytes directly, skipping FastAPI's ``jsonable_encoder`` round trip
+    through Python dicts.
+    """
+    model = adapter.validate_python(value, from_attributes=True)
+    return PrebuiltJSONResponse(adapter.dump_json(model), status_code=status_code, headers=headers)
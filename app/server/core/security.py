@@ -0,0 +1,110 @@
+"""Access token helpers."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, NamedTuple, Optional
+from jose import JWTError, jwt
+
+from .config import settings
+
+
+class TokenClaims(NamedTuple):
+    """Claims of a verified access token."""
+    user_id: int
+    exp: Optional[int]
+    user: Optional[Dict[str, Any]] = None
+
+
+class TokenCache:
+    """LRU of verified access tokens keyed by token digest.
+
+    A token is presented many times over its lifetime; after the first
+    successful decode, repeat presentations skip signature verification
+    and parsing. Expiry is re-checked on every lookup with the same rule
+    ``jose`` applies, so cached tokens stop working at the same second.
+    """
+
+    def __init__(self, maxsize: int = None):
+        self.maxsize = maxsize or settings.jwt_cache_size
+        self._entries: "OrderedDict[bytes, TokenClaims]" = OrderedDict()
+
+    def decode(self, token: str) -> Optional[TokenClaims]:
+        """Verify token and return its claims, or None if invalid."""
+        digest = hashlib.sha256(token.encode()).digest()
+
+        claims = self._entries.get(digest)
+        if claims is not None:
+            if claims.exp is not None and claims.exp < int(time.time()):
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return claims
+
+        try:
+            payload = jwt.decode(
+                token,
+                settings.jwt_secret,
+                algorithms=[settings.jwt_algorithm]
+            )
+            user_id = int(payload["sub"])
+        except (JWTError, KeyError, TypeError, ValueError):
+            return None
+
+        exp = payload.get("exp")
+        claims = TokenClaims(user_id, int(exp) if exp is not None else None, payload.get("usr"))
+
+        self._entries[digest] = claims
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return claims
+
+    def clear(self):
+        """Drop all cached tokens."""
+        self._entries.clear()
+
+
+# Global token cache instance
+token_cache = TokenCache()
+
+
+def get_bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Extract token from an ``Authorization: Bearer`` header value."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+def _stream_token_secret() -> str:
+    """Key for stream tokens, distinct from the access token key.
+    
+    A stream token therefore never passes as an access token.
+    """
+    return f"{settings.jwt_secret}:order_events"
+
+
+def create_stream_token(user_id: int, order_id: int) -> str:
+    """Create a short-lived token that opens one order's event stream."""
+    expire = datetime.utcnow() + timedelta(seconds=settings.order_events_token_ttl)
+    payload = {"sub": str(user_id), "oid": order_id, "exp": expire}
+    return jwt.encode(payload, _stream_token_secret(), algorithm=settings.jwt_algorithm)
+
+
+def verify_stream_token(token: str, order_id: int) -> Optional[int]:
+    """Return the user ID of a valid stream token for ``order_id``, else None."""
+    try:
+        payload = jwt.decode(
+            token,
+            _stream_token_secret(),
+            algorithms=[settings.jwt_algorithm]
+        )
+        if int(payload["oid"]) != order_id:
+            return None
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
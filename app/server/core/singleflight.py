@@ -0,0 +1,85 @@
+"""In-process single-flight coalescing of identical concurrent reads.
+
+A double tap or the same user opening the mini app on two devices sends
+identical reads at the same moment. Calls made through ``single_flight``
+with the same key while one is already running wait for that call and
+share its result (or exception) instead of querying again. Nothing is
+cached: once the call finishes, the next one runs anew.
+
+Keys are tuples starting with a name, e.g. ``("get_order", user_id,
+order_id)``; include everything that changes the result. The first caller
+runs the call inline, on its own session, so an uncontended call costs no
+extra task or connection. If it goes away before finishing, the callers
+still waiting start the call again on their own sessions. Shared results
+are seen by several requests, so they must be plain data (bytes, tuples,
+dicts), never ORM objects, and must not be mutated.
+"""
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from core.metrics import SINGLE_FLIGHT_COALESCED
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Registry of in-flight calls by key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Tuple[Hashable, ...], fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn()`` inline, or wait for the running call with the same key."""
+        while key in self._calls:
+            call = self._calls[key]
+            SINGLE_FLIGHT_COALESCED.labels(name=str(key[0])).inc()
+            try:
+                # Shielded, so this caller going away does not cancel the
+                # call for everyone else waiting on it
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if not call.cancelled():
+                    raise
+                # The caller running it went away; run it again
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            # Retrieved by the caller below, even if nobody else waits
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def coalesce(self, name: str):
+        """Decorate an async service method so identical concurrent calls share one run.
+
+        The key is ``name`` plus the call's arguments (excluding ``self``),
+        which must be hashable. The method runs on the instance of the
+        caller that starts the call, so it must only read.
+        """
+
+        def decorator(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            @functools.wraps(method)
+            async def wrapper(instance: Any, *args: Any, **kwargs: Any) -> T:
+                key = (name, *args, *sorted(kwargs.items()))
+                return await self.do(key, lambda: method(instance, *args, **kwargs))
+
+            return wrapper
+
+        return decorator
+
+
+# Global single-flight instance
+single_flight = SingleFlight()
@@ -0,0 +1,73 @@
+"""Request trace ID propagation.
+
+The trace ID of the current request or task lives in a contextvar and is
+bound into structlog's contextvars, so every log line emitted while
+handling it carries ``trace_id`` without passing it around. IDs follow
+the W3C Trace Context format: an incoming ``traceparent`` header is
+continued, otherwise a random 128-bit ID is generated. The ID travels to
+Celery tasks in a message header and to outbound HTTP calls as
+``traceparent``.
+"""
+
+import re
+import secrets
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+import httpx
+from structlog.contextvars import bound_contextvars
+
+TRACE_HEADER = "trace_id"
+
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+
+trace_id_var: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+
+def new_trace_id() -> str:
+    """Generate a random W3C trace ID."""
+    return secrets.token_hex(16)
+
+
+def trace_id_from_traceparent(traceparent: Optional[str]) -> Optional[str]:
+    """Extract trace ID from a ``traceparent`` header value."""
+    if not traceparent:
+        return None
+    match = _TRACEPARENT_RE.match(traceparent.strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None
+    return match.group(1)
+
+
+def get_trace_id() -> Optional[str]:
+    """Get trace ID of the current context."""
+    return trace_id_var.get()
+
+
+@contextmanager
+def trace_context(trace_id: str) -> Iterator[str]:
+    """Bind ``trace_id`` to the current context and its log lines."""
+    token = trace_id_var.set(trace_id)
+    try:
+        with bound_contextvars(trace_id=trace_id):
+            yield trace_id
+    finally:
+        trace_id_var.reset(token)
+
+
+def traceparent_headers() -> Dict[str, str]:
+    """Get ``traceparent`` header for an outbound call, if tracing."""
+    trace_id = trace_id_var.get()
+    if trace_id is None:
+        return {}
+    return {"traceparent": f"00-{trace_id}-{secrets.token_hex(8)}-01"}
+
+
+async def inject_trace_headers(request: httpx.Request):
+    """httpx request hook adding ``traceparent`` to outbound calls."""
+    request.headers.update(traceparent_headers())
+
+
+# Pass as ``event_hooks`` to httpx clients
+HTTPX_EVENT_HOOKS = {"request": [inject_trace_headers]}
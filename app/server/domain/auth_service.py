@@ -1,20 +1,49 @@
 """Authentication service."""
 
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Any, Dict, Optional
+from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Boolean, column, exists, func, literal, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from core.cache import TieredCache
 from core.config import settings
 from core.database import get_db
+from core.security import token_cache
+from core.singleflight import single_flight
 from models.user import User, UserLanguage
 from schemas.auth import UserResponse
 
 security = HTTPBearer()
 
+# Authenticated users by ID, invalidated when the profile changes
+user_cache = TieredCache(
+    "user",
+    ttl=settings.user_cache_ttl,
+    local_ttl=settings.user_cache_local_ttl,
+    maxsize=settings.user_cache_size,
+)
+
+
+def _user_to_dict(user: User) -> Dict[str, Any]:
+    """Serialize user for the cache and token claims."""
+    return UserResponse.model_validate(user, from_attributes=True).model_dump(mode="json")
+
+
+def _user_claims(user: User) -> Dict[str, Any]:
+    """Profile embedded in access tokens; contact details stay out."""
+    claims = _user_to_dict(user)
+    claims.pop("phone", None)
+    return claims
+
+
+def _user_from_dict(data: Dict[str, Any]) -> User:
+    """Build a detached user from cached data or token claims."""
+    return User(**UserResponse.model_validate(data).model_dump())
+
 
 class AuthService:
     """Authentication service."""
@@ -30,56 +59,82 @@ class AuthService:
         last_name: Optional[str] = None,
         language_code: str = "ru"
     ) -> User:
-        """Get or create user by Telegram ID."""
+        """Get or create user by Telegram ID.
+        
+        Runs as a single ``INSERT ... ON CONFLICT DO UPDATE`` statement, so
+        concurrent first logins cannot race into a unique violation. The
+        profile of an existing user is written only when a non-empty
+        value differs from the stored one; otherwise the stored row is
+        returned from the same statement.
+        """
         
-        # Try to find existing user
-        result = await self.db.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if user:
-            # Update user info if needed
-            updated = False
-            if username and user.username != username:
-                user.username = username
-                updated = True
-            if first_name and user.first_name != first_name:
-                user.first_name = first_name
-                updated = True
-            if last_name and user.last_name != last_name:
-                user.last_name = last_name
-                updated = True
-            
-            if updated:
-                await self.db.commit()
-                await self.db.refresh(user)
-            
-            return user
-        
-        # Create new user
         locale = UserLanguage.RU
         if language_code in ["kz", "kk"]:
             locale = UserLanguage.KZ
         elif language_code in ["en"]:
             locale = UserLanguage.EN
         
-        user = User(
+        insert_stmt = pg_insert(User).values(
             telegram_id=telegram_id,
             username=username,
             first_name=first_name,
             last_name=last_name,
-            locale=locale
+            locale=locale,
+            created_at=datetime.utcnow(),
+        )
+        
+        # Keep stored values when the new ones are empty
+        profile = {
+            name: func.coalesce(func.nullif(insert_stmt.excluded[name], ""), User.__table__.c[name])
+            for name in ("username", "first_name", "last_name")
+        }
+        upsert = insert_stmt.on_conflict_do_update(
+            index_elements=[User.telegram_id],
+            set_=profile,
+            where=or_(*(
+                User.__table__.c[name].is_distinct_from(value)
+                for name, value in profile.items()
+            )),
+        ).returning(*User.__table__.c, literal(True).label("written")).cte("upsert")
+        
+        # An unchanged existing user is not returned by the upsert itself
+        stmt = union_all(
+            select(*upsert.c),
+            select(*User.__table__.c, literal(False).label("written")).where(
+                User.telegram_id == telegram_id,
+                ~exists(select(upsert.c.id)),
+            ),
         )
+        result = await self.db.execute(
+            select(User, column("written", Boolean)).from_statement(stmt)
+        )
+        row = result.one_or_none()
+        
+        if row is None:
+            # A concurrent insert committed after this statement's snapshot;
+            # it is not known whether it matches this profile, so treat the
+            # row as written and drop any cached copy
+            result = await self.db.execute(
+                select(User).where(User.telegram_id == telegram_id)
+            )
+            user, written = result.scalar_one(), True
+        else:
+            user, written = row
         
-        self.db.add(user)
+        # Commit either way to release the row lock
         await self.db.commit()
-        await self.db.refresh(user)
+        if written:
+            await user_cache.delete(user.id)
         
         return user
     
-    def create_access_token(self, user_id: int) -> str:
-        """Create JWT access token."""
+    def create_access_token(self, user_id: int, user: Optional[User] = None) -> str:
+        """Create JWT access token.
+        
+        When ``user`` is given and ``auth_trust_token_claims`` is enabled,
+        its profile (without phone) is embedded as the ``usr`` claim so
+        read-only routes can skip the user lookup.
+        """
         expire = datetime.utcnow() + timedelta(minutes=settings.jwt_expire_minutes)
         
         to_encode = {
@@ -87,6 +142,8 @@ class AuthService:
             "exp": expire,
             "iat": datetime.utcnow(),
         }
+        if user is not None and settings.auth_trust_token_claims:
+            to_encode["usr"] = _user_claims(user)
         
         return jwt.encode(
             to_encode,
@@ -95,19 +152,13 @@ class AuthService:
         )
     
     def verify_token(self, token: str) -> Optional[int]:
-        """Verify JWT token and return user ID."""
-        try:
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret,
-                algorithms=[settings.jwt_algorithm]
-            )
-            user_id: str = payload.get("sub")
-            if user_id is None:
-                return None
-            return int(user_id)
-        except JWTError:
-            return None
+        """Verify JWT token and return user ID.
+        
+        Goes through the shared token cache, so only the first
+        presentation of a token pays for signature verification.
+        """
+        claims = token_cache.decode(token)
+        return claims.user_id if claims else None
     
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
@@ -116,6 +167,28 @@ class AuthService:
         )
         return result.scalar_one_or_none()
     
+    async def get_cached_user(self, user_id: int) -> Optional[User]:
+        """Get user by ID through the user cache.
+        
+        Every caller gets its own detached ``User``.
+        """
+        data = await self._get_cached_user_data(user_id)
+        return _user_from_dict(data) if data is not None else None
+    
+    @single_flight.coalesce("user")
+    async def _get_cached_user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get cached user data, loading and caching it on a miss."""
+        data = await user_cache.get(user_id)
+        if data is not None:
+            return data
+        
+        user = await self.get_user_by_id(user_id)
+        if user is None:
+            return None
+        data = _user_to_dict(user)
+        await user_cache.set(user_id, data)
+        return data
+    
     @staticmethod
     async def get_current_user(
         credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -132,7 +205,7 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user = await auth_service.get_user_by_id(user_id)
+        user = await auth_service.get_cached_user(user_id)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -141,6 +214,24 @@ class AuthService:
             )
         
         return user
+    
+    @staticmethod
+    async def get_current_user_from_claims(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: AsyncSession = Depends(get_db)
+    ) -> User:
+        """Get current user for read-only routes.
+        
+        With ``auth_trust_token_claims`` enabled, the user is built from the
+        profile embedded in the token without any lookup; otherwise this is
+        the same as ``get_current_user``.
+        """
+        if settings.auth_trust_token_claims:
+            claims = token_cache.decode(credentials.credentials)
+            if claims is not None and claims.user:
+                return _user_from_dict(claims.user)
+        
+        return await AuthService.get_current_user(credentials, db)
 
 
 # Dependency for getting current user
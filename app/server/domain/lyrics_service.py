@@ -2,9 +2,9 @@
 
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 
 from core.config import settings
 from models.order import Order
@@ -46,14 +46,9 @@ class LyricsService:
         # Parse response
         lyrics_data = self._parse_lyrics_response(response)
         
-        # Get next version number
-        latest = await self._get_latest_lyrics_version(order_id)
-        next_version = (latest.version + 1) if latest else 1
-        
         # Create lyrics version
-        lyrics_version = LyricsVersion(
-            order_id=order_id,
-            version=next_version,
+        lyrics_version = await self.add_lyrics_version(
+            order_id,
             text=lyrics_data["text"],
             gpt_model=settings.openai_model,
             prompt_used=lyrics_data.get("prompt_used"),
@@ -62,10 +57,36 @@ class LyricsService:
             quality_score=lyrics_data.get("quality_score"),
             status="ready"
         )
+        await self.db.commit()
+        
+        return lyrics_version
+    
+    async def add_lyrics_version(self, order_id: int, **values: Any) -> LyricsVersion:
+        """Add the next lyrics version of an order without committing.
+        
+        One ``UPDATE ... RETURNING`` bumps ``orders.lyrics_version_seq``
+        for the version number and points the order at a lyrics ID drawn
+        from the table's sequence; its row lock serializes concurrent
+        writers. The row is then inserted under that ID.
+        """
+        lyrics_id = func.nextval(func.pg_get_serial_sequence(LyricsVersion.__tablename__, "id"))
+        result = await self.db.execute(
+            update(Order)
+            .where(Order.id == order_id)
+            .values(
+                lyrics_version_seq=Order.lyrics_version_seq + 1,
+                latest_lyrics_version_id=lyrics_id,
+            )
+            .returning(Order.lyrics_version_seq, Order.latest_lyrics_version_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise ValueError("Order not found")
         
+        version, lyrics_id = row
+        lyrics_version = LyricsVersion(id=lyrics_id, order_id=order_id, version=version, **values)
         self.db.add(lyrics_version)
-        await self.db.commit()
-        await self.db.refresh(lyrics_version)
+        await self.db.flush()
         
         return lyrics_version
     
@@ -164,14 +185,3 @@ class LyricsService:
                 "tokens_out": len(response.split()),
                 "quality_score": 0.6
             }
-    
-    async def _get_latest_lyrics_version(self, order_id: int) -> Optional[LyricsVersion]:
-        """Get latest lyrics version for order."""
-        result = await self.db.execute(
-            select(LyricsVersion)
-            .where(LyricsVersion.order_id == order_id)
-            .order_by(LyricsVersion.version.desc())
-            .limit(1)
-        )
-        return result.scalar_one_or_none()
-
@@ -1,18 +1,100 @@
 """Order service."""
 
-from typing import List, Tuple, Optional
+from datetime import datetime
+from typing import Collection, Dict, Iterable, List, NamedTuple, Tuple, Optional
+import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, and_, tuple_, update
+from sqlalchemy.orm import load_only, selectinload
 
-from models.order import Order, OrderStatus
+from models.order import Order, OrderStatus, ORDER_TRANSITIONS
+from models.order_list_version import OrderListVersion
 from models.lyrics_version import LyricsVersion
 from models.audio_asset import AudioAsset
 from models.payment import Payment
-from schemas.order import OrderCreate, OrderUpdate, LyricsGenerateRequest, LyricsEditRequest
+from schemas.order import (
+    OrderCreate, OrderUpdate, LyricsGenerateRequest, LyricsEditRequest,
+    ORDER_RESPONSE_ADAPTER, SUMMARY_FIELDS
+)
 from .lyrics_service import LyricsService
 
+from core.cache import VersionedCache
+from core.config import settings
 from core.database import get_db
+from core.etag import make_etag
+from core.metrics import ORDER_CACHE_HITS, ORDER_CACHE_MISSES
+from core.pagination import decode_cursor, encode_cursor
+from core.redis import get_redis
+from core.singleflight import single_flight
+
+logger = structlog.get_logger()
+
+# Orders that no longer change
+FINAL_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELED)
+
+# Serialized OrderResponse by order ID; every write path bumps the version
+order_cache = VersionedCache("order", ttl=settings.order_cache_ttl)
+
+
+def _order_load_options(fields: Optional[Collection[str]], include: Collection[str]) -> list:
+    """Loader options selecting only the given columns and relations.
+    
+    ``id``, ``user_id`` and ``created_at`` are always loaded for ownership
+    checks and cursors. ``fields=None`` loads every column.
+    """
+    options = []
+    if fields is not None:
+        columns = {"id", "user_id", "created_at", *fields}
+        options.append(load_only(*(getattr(Order, column) for column in columns)))
+    for relation in include:
+        options.append(selectinload(getattr(Order, relation)))
+    return options
+
+
+class OrderRef(NamedTuple):
+    """Slim order reference for ownership checks."""
+    id: int
+    user_id: int
+    status: OrderStatus
+
+
+class OrderVersion(NamedTuple):
+    """What an order response depends on, for ETags."""
+    id: int
+    user_id: int
+    updated_at: datetime
+    latest_lyrics_id: Optional[int]
+    latest_audio_id: Optional[int]
+
+
+def order_etag(version: OrderVersion, *variant) -> str:
+    """Get the ETag of an order response.
+    
+    ``variant`` distinguishes representations of the same order, such
+    as sparse fieldsets.
+    """
+    return make_etag(
+        "order",
+        version.id,
+        version.updated_at.isoformat(),
+        version.latest_lyrics_id,
+        version.latest_audio_id,
+        *variant,
+    )
+
+
+class InvalidTransition(ValueError):
+    """Order is missing or not in a status the transition starts from."""
+
+
+def _status_filter(status: Optional[str]) -> Optional[OrderStatus]:
+    """Parse status filter; invalid values are ignored."""
+    if not status:
+        return None
+    try:
+        return OrderStatus(status)
+    except ValueError:
+        return None
 
 
 class OrderService:
@@ -39,77 +121,212 @@ class OrderService:
         await self.db.commit()
         await self.db.refresh(order)
         
+        await self._invalidate_order_counts(user_id)
+        
         return order
     
-    async def get_order_by_id(self, order_id: int) -> Optional[Order]:
-        """Get order by ID with related data."""
-        result = await self.db.execute(
-            select(Order)
-            .options(
+    async def get_order_by_id(
+        self,
+        order_id: int,
+        fields: Optional[Collection[str]] = None,
+        include: Optional[Collection[str]] = None,
+    ) -> Optional[Order]:
+        """Get order by ID with related data.
+        
+        ``fields`` and ``include`` restrict the loaded columns and
+        relations; by default everything is loaded.
+        """
+        query = select(Order).where(Order.id == order_id)
+        if fields is None and include is None:
+            query = query.options(
                 selectinload(Order.lyrics_versions),
                 selectinload(Order.audio_assets),
                 selectinload(Order.payments)
             )
-            .where(Order.id == order_id)
-        )
+        else:
+            query = query.options(*_order_load_options(fields, include or ()))
+        
+        result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
+    @single_flight.coalesce("order_response")
+    async def get_order_response(self, order_id: int) -> Optional[Tuple[int, str, str]]:
+        """Get owner ID, ETag and serialized ``OrderResponse`` through the order cache."""
+        version, cached = await order_cache.get(order_id)
+        if cached is not None:
+            ORDER_CACHE_HITS.inc()
+            user_id, etag, body = cached.split("|", 2)
+            return int(user_id), etag, body
+        
+        ORDER_CACHE_MISSES.inc()
+        order = await self.get_order_by_id(order_id)
+        if not order:
+            return None
+        
+        etag = order_etag(OrderVersion(
+            order.id,
+            order.user_id,
+            order.updated_at,
+            order.latest_lyrics_version_id,
+            order.latest_audio_asset_id,
+        ))
+        body = ORDER_RESPONSE_ADAPTER.dump_json(
+            ORDER_RESPONSE_ADAPTER.validate_python(order, from_attributes=True)
+        ).decode()
+        await order_cache.set(order_id, version, f"{order.user_id}|{etag}|{body}")
+        return order.user_id, etag, body
+    
+    @single_flight.coalesce("order_version")
+    async def get_order_version(self, order_id: int) -> Optional[OrderVersion]:
+        """Get what the order's responses depend on with one indexed lookup."""
+        result = await self.db.execute(
+            select(
+                Order.id,
+                Order.user_id,
+                Order.updated_at,
+                Order.latest_lyrics_version_id,
+                Order.latest_audio_asset_id,
+            ).where(Order.id == order_id)
+        )
+        row = result.one_or_none()
+        return OrderVersion(*row) if row else None
+    
+    @single_flight.coalesce("order_list_version")
+    async def get_order_list_version(self, user_id: int) -> int:
+        """Get the version of the user's order list, for ETags.
+        
+        One primary key lookup; a trigger bumps it on every change to the
+        user's orders, including their latest lyrics and audio pointers.
+        """
+        result = await self.db.execute(
+            select(OrderListVersion.version).where(OrderListVersion.user_id == user_id)
+        )
+        return result.scalar() or 0
+    
+    async def get_order_ref(self, order_id: int) -> Optional[OrderRef]:
+        """Get order ID, owner and status with one indexed lookup."""
+        result = await self.db.execute(
+            select(Order.id, Order.user_id, Order.status).where(Order.id == order_id)
+        )
+        row = result.one_or_none()
+        return OrderRef(*row) if row else None
+    
     async def get_user_orders(
         self,
         user_id: int,
         skip: int = 0,
         limit: int = 20,
-        status: Optional[str] = None
-    ) -> Tuple[List[Order], int]:
-        """Get user's orders with pagination."""
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fields: Optional[Collection[str]] = SUMMARY_FIELDS,
+        include: Collection[str] = (),
+    ) -> Tuple[List[Order], Optional[int], Optional[str]]:
+        """Get user's orders with pagination.
+        
+        Pages by ``cursor`` (keyset on ``created_at, id``) when given,
+        otherwise by ``skip``. Returns orders, the total count (None unless
+        ``include_total``) and the cursor of the next page, if any. Only
+        the summary columns are loaded unless ``fields``/``include`` ask
+        for more.
+        """
         
         # Build query
-        query = select(Order).where(Order.user_id == user_id)
+        query = (
+            select(Order)
+            .options(*_order_load_options(fields, include))
+            .where(Order.user_id == user_id)
+        )
         
-        if status:
-            try:
-                order_status = OrderStatus(status)
-                query = query.where(Order.status == order_status)
-            except ValueError:
-                pass  # Invalid status, ignore filter
+        order_status = _status_filter(status)
+        if order_status:
+            query = query.where(Order.status == order_status)
         
         # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        total = None
+        if include_total:
+            total = await self._count_user_orders(user_id, order_status)
         
-        # Get orders with pagination
-        query = query.order_by(Order.created_at.desc()).offset(skip).limit(limit)
-        result = await self.db.execute(query)
-        orders = result.scalars().all()
+        # Get orders with pagination, one extra row tells whether a next page exists
+        query = query.order_by(Order.created_at.desc(), Order.id.desc())
+        if cursor:
+            created_at, order_id = decode_cursor(cursor)
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(created_at, order_id))
+        else:
+            query = query.offset(skip)
+        result = await self.db.execute(query.limit(limit + 1))
+        orders = list(result.scalars().all())
+        
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+        
+        return orders, total, next_cursor
+    
+    async def _count_user_orders(self, user_id: int, status: Optional[OrderStatus]) -> int:
+        """Count user's orders, cached in Redis for a short time."""
+        key = f"orders:count:{user_id}:{status.value if status else 'all'}"
+        
+        try:
+            redis = await get_redis()
+            cached = await redis.get(key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning("Order count cache read failed", error=str(e))
+            redis = None
+        
+        query = select(func.count()).select_from(Order).where(Order.user_id == user_id)
+        if status:
+            query = query.where(Order.status == status)
+        total = (await self.db.execute(query)).scalar()
         
-        return list(orders), total
+        if redis is not None:
+            try:
+                await redis.set(key, total, ex=settings.order_count_cache_ttl)
+            except Exception as e:
+                logger.warning("Order count cache write failed", error=str(e))
+        
+        return total
+    
+    async def _invalidate_order_counts(self, user_id: int):
+        """Drop cached order counts of a user."""
+        keys = [f"orders:count:{user_id}:all"] + [
+            f"orders:count:{user_id}:{status.value}" for status in OrderStatus
+        ]
+        try:
+            redis = await get_redis()
+            await redis.delete(*keys)
+        except Exception as e:
+            logger.warning("Order count cache invalidation failed", error=str(e))
     
     async def update_order(self, order_id: int, order_data: OrderUpdate) -> Order:
         """Update order."""
+        update_data = order_data.dict(exclude_unset=True)
+        if update_data:
+            await self.db.execute(
+                update(Order).where(Order.id == order_id).values(**update_data)
+            )
+            await self.db.commit()
+            await order_cache.bump(order_id)
+        
         order = await self.get_order_by_id(order_id)
         if not order:
             raise ValueError("Order not found")
         
-        # Update fields
-        update_data = order_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(order, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(order)
-        
         return order
     
     async def generate_lyrics(self, order_id: int, request: LyricsGenerateRequest) -> str:
         """Generate lyrics for order."""
-        order = await self.get_order_by_id(order_id)
-        if not order:
-            raise ValueError("Order not found")
-        
         # Update order status
-        order.status = OrderStatus.PENDING_LYRICS
+        await self.transition(
+            order_id,
+            (OrderStatus.DRAFT, OrderStatus.LYRICS_READY),
+            OrderStatus.PENDING_LYRICS,
+        )
         await self.db.commit()
+        await order_cache.bump(order_id)
         
         # Start lyrics generation task
         task_id = await self.lyrics_service.generate_lyrics_async(order_id, request)
@@ -120,55 +337,55 @@ class OrderService:
         """Get latest lyrics version for order."""
         result = await self.db.execute(
             select(LyricsVersion)
-            .where(LyricsVersion.order_id == order_id)
-            .order_by(LyricsVersion.version.desc())
-            .limit(1)
+            .join(Order, Order.latest_lyrics_version_id == LyricsVersion.id)
+            .where(Order.id == order_id)
         )
         return result.scalar_one_or_none()
     
+    async def get_active_latest_lyrics(self, user_id: int) -> Dict[int, LyricsVersion]:
+        """Get latest lyrics version of each of the user's active orders."""
+        result = await self.db.execute(
+            select(LyricsVersion)
+            .join(Order, Order.latest_lyrics_version_id == LyricsVersion.id)
+            .where(Order.user_id == user_id, Order.status.notin_(FINAL_STATUSES))
+        )
+        return {lyrics.order_id: lyrics for lyrics in result.scalars()}
+    
     async def submit_lyrics_edit(self, order_id: int, request: LyricsEditRequest) -> LyricsVersion:
         """Submit edited lyrics."""
-        order = await self.get_order_by_id(order_id)
-        if not order:
-            raise ValueError("Order not found")
-        
-        # Get latest version number
-        latest = await self.get_latest_lyrics(order_id)
-        next_version = (latest.version + 1) if latest else 1
+        # Update order status
+        await self.transition(order_id, (OrderStatus.LYRICS_READY,), OrderStatus.LYRICS_READY)
         
         # Create new lyrics version
-        lyrics_version = LyricsVersion(
-            order_id=order_id,
-            version=next_version,
+        lyrics_version = await self.lyrics_service.add_lyrics_version(
+            order_id,
             text=request.text,
             status="ready"
         )
-        
-        self.db.add(lyrics_version)
-        
-        # Update order status
-        order.status = OrderStatus.LYRICS_READY
         await self.db.commit()
-        await self.db.refresh(lyrics_version)
+        await order_cache.bump(order_id)
         
         return lyrics_version
     
     async def approve_order(self, order_id: int) -> Order:
         """Approve order for processing."""
+        await self.transition(order_id, (OrderStatus.LYRICS_READY,), OrderStatus.APPROVED)
+        await self.db.commit()
+        await order_cache.bump(order_id)
+        
         order = await self.get_order_by_id(order_id)
         if not order:
             raise ValueError("Order not found")
         
-        order.status = OrderStatus.APPROVED
-        await self.db.commit()
-        await self.db.refresh(order)
-        
         return order
     
     async def create_payment(self, order_id: int) -> Payment:
         """Create payment for order."""
-        order = await self.get_order_by_id(order_id)
-        if not order:
+        result = await self.db.execute(
+            select(Order.price, Order.currency).where(Order.id == order_id)
+        )
+        row = result.one_or_none()
+        if not row:
             raise ValueError("Order not found")
         
         # For now, create a simple payment record
@@ -176,27 +393,18 @@ class OrderService:
         payment = Payment(
             order_id=order_id,
             provider="stripe",  # Default provider
-            amount=order.price or 0,
-            currency=order.currency,
+            amount=row.price or 0,
+            currency=row.currency,
             status="pending"
         )
         
         self.db.add(payment)
         await self.db.commit()
-        await self.db.refresh(payment)
         
         return payment
     
     async def generate_audio(self, order_id: int) -> str:
         """Generate audio for order."""
-        order = await self.get_order_by_id(order_id)
-        if not order:
-            raise ValueError("Order not found")
-        
-        # Update order status
-        order.status = OrderStatus.GENERATING
-        await self.db.commit()
-        
         # Create audio asset
         audio_asset = AudioAsset(
             order_id=order_id,
@@ -206,12 +414,56 @@ class OrderService:
         )
         
         self.db.add(audio_asset)
+        await self.db.flush()
+        
+        # Update order status and latest audio pointer
+        await self.transition(
+            order_id,
+            (OrderStatus.APPROVED,),
+            OrderStatus.GENERATING,
+            latest_audio_asset_id=audio_asset.id,
+        )
         await self.db.commit()
-        await self.db.refresh(audio_asset)
+        await order_cache.bump(order_id)
         
         # Start audio generation task (placeholder)
         # In real implementation, integrate with Suno API
         task_id = f"audio_{audio_asset.id}"
         
         return task_id
-
+    
+    async def transition(
+        self,
+        order_id: int,
+        from_states: Iterable[OrderStatus],
+        to_state: OrderStatus,
+        **values,
+    ):
+        """Move an order to ``to_state`` if it is currently in ``from_states``.
+        
+        A single conditional ``UPDATE ... RETURNING`` does the check and the
+        write, so concurrent transitions cannot both succeed. Other columns
+        in ``values`` are set in the same statement. Does not commit.
+        """
+        from_states = tuple(from_states)
+        illegal = [state for state in from_states if to_state not in ORDER_TRANSITIONS[state]]
+        if illegal:
+            raise ValueError(
+                f"Illegal order transition to {to_state.value} from "
+                f"{', '.join(state.value for state in illegal)}"
+            )
+        
+        result = await self.db.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.status.in_(from_states))
+            .values(status=to_state, **values)
+            .returning(Order.user_id)
+        )
+        user_id = result.scalar_one_or_none()
+        if user_id is None:
+            raise InvalidTransition(
+                f"Order cannot move to {to_state.value} from its current status"
+            )
+        
+        # Per-status counts of the user's orders just changed
+        await self._invalidate_order_counts(user_id)
@@ -5,6 +5,7 @@ from typing import Dict, Any, Optional
 import structlog
 
 from core.config import settings
+from core.tracing import HTTPX_EVENT_HOOKS
 
 logger = structlog.get_logger()
 
@@ -37,7 +38,7 @@ class OpenAIClient:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with httpx.AsyncClient(timeout=60.0, event_hooks=HTTPX_EVENT_HOOKS) as client:
             try:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
@@ -88,7 +89,7 @@ class OpenAIClient:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=HTTPX_EVENT_HOOKS) as client:
             try:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
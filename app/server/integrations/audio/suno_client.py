@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional, List
 import structlog
 
 from core.config import settings
+from core.tracing import HTTPX_EVENT_HOOKS
 
 logger = structlog.get_logger()
 
@@ -49,7 +50,7 @@ class SunoClient:
         if callback_url:
             custom_payload["callBackUrl"] = callback_url
         
-        async with httpx.AsyncClient(timeout=45.0) as client:
+        async with httpx.AsyncClient(timeout=45.0, event_hooks=HTTPX_EVENT_HOOKS) as client:
             try:
                 response = await client.post(
                     f"{self.base_url}/api/v1/generate",
@@ -126,7 +127,7 @@ class SunoClient:
             "Authorization": f"Bearer {self.api_key}"
         }
         
-        async with httpx.AsyncClient(timeout=20.0) as client:
+        async with httpx.AsyncClient(timeout=20.0, event_hooks=HTTPX_EVENT_HOOKS) as client:
             try:
                 response = await client.get(
                     f"{self.base_url}/api/v1/generate/record-info",
@@ -1,56 +1,31 @@
 """FastAPI application entry point."""
 
-import logging
 import structlog
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from fastapi.responses import JSONResponse, ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 from starlette.responses import Response
-import time
 
 from core.config import settings
 from core.database import init_db
 from core.redis import redis_client
-from api.v1 import auth, orders, health
-from core.middleware import RateLimitMiddleware, LoggingMiddleware
+from core.metrics import render_metrics
+from core.logs import configure_logging, log_sink
+from core.rate_limit import rate_limiter
+from core.events import order_events
+from core.change_feed import order_changes
+from api.v1 import auth, bootstrap, orders, health
+from core.middleware import RateLimitMiddleware, LoggingMiddleware, PrometheusMiddleware
 
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+configure_logging()
 
 logger = structlog.get_logger()
 
-# Prometheus metrics
-REQUEST_COUNT = Counter(
-    "http_requests_total", 
-    "Total HTTP requests", 
-    ["method", "endpoint", "status"]
-)
-REQUEST_DURATION = Histogram(
-    "http_request_duration_seconds", 
-    "HTTP request duration",
-    ["method", "endpoint"]
-)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -63,14 +38,31 @@ async def lifespan(app: FastAPI):
     logger.info("Database initialized")
     
     # Initialize Redis
-    await redis_client.get_client()
+    redis = await redis_client.get_client()
     logger.info("Redis connected")
     
+    # Preload rate limiter script and start local quota sync
+    await rate_limiter.start(redis)
+    logger.info("Rate limiter started")
+    
+    # Subscribe to order events for live streams
+    await order_events.start(redis)
+    logger.info("Order event hub started")
+    
+    # Listen for order changes made by other instances and workers
+    order_changes.add_listener(order_events.on_order_change)
+    await order_changes.start()
+    logger.info("Order change feed started")
+    
     yield
     
     # Shutdown
+    await order_changes.stop()
+    await order_events.stop()
+    await rate_limiter.stop()
     await redis_client.close()
     logger.info("Application shutdown complete")
+    log_sink.stop()
 
 
 # Create FastAPI app
@@ -82,6 +74,7 @@ app = FastAPI(
     redoc_url="/redoc" if settings.debug else None,
     openapi_url="/openapi.json" if settings.debug else None,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Middleware
@@ -100,29 +93,7 @@ app.add_middleware(
 
 app.add_middleware(RateLimitMiddleware)
 app.add_middleware(LoggingMiddleware)
-
-
-@app.middleware("http")
-async def prometheus_middleware(request: Request, call_next):
-    """Prometheus metrics middleware."""
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    # Record metrics
-    duration = time.time() - start_time
-    REQUEST_COUNT.labels(
-        method=request.method,
-        endpoint=request.url.path,
-        status=response.status_code
-    ).inc()
-    
-    REQUEST_DURATION.labels(
-        method=request.method,
-        endpoint=request.url.path
-    ).observe(duration)
-    
-    return response
+app.add_middleware(PrometheusMiddleware)
 
 
 @app.exception_handler(Exception)
@@ -162,7 +133,7 @@ async def metrics():
         )
     
     return Response(
-        generate_latest(),
+        render_metrics(),
         media_type=CONTENT_TYPE_LATEST
     )
 
@@ -170,6 +141,7 @@ async def metrics():
 # Include routers
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
+app.include_router(bootstrap.router, prefix="/api/v1", tags=["auth"])
 app.include_router(orders.router, prefix="/api/v1", tags=["orders"])
 
 
@@ -0,0 +1,150 @@
+"""Composite indexes for hot order and lyrics queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = [
+    ('ix_orders_user_id_created_at', 'orders'),
+    ('ix_orders_user_id_status_created_at', 'orders'),
+    ('uq_lyrics_versions_order_id_version', 'lyrics_versions'),
+]
+
+
+def _index_valid(name: str):
+    """True/False for an existing index's validity, None if it is missing."""
+    return op.get_bind().execute(
+        sa.text("""
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name
+        """),
+        {'name': name},
+    ).scalar()
+
+
+def upgrade() -> None:
+    # Version numbering used to be read-then-insert, so concurrent writers
+    # could store the same (order_id, version) twice. Renumber the affected
+    # orders by insertion order so the unique index can be built.
+    op.execute("""
+        UPDATE lyrics_versions lv
+        SET version = r.rn
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY order_id ORDER BY version, id) AS rn
+            FROM lyrics_versions
+            WHERE order_id IN (
+                SELECT order_id
+                FROM lyrics_versions
+                GROUP BY order_id, version
+                HAVING count(*) > 1
+            )
+        ) r
+        WHERE r.id = lv.id AND lv.version <> r.rn
+    """)
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        # A failed concurrent build leaves an INVALID index behind, which
+        # if_not_exists would skip on a rerun; drop it and build again
+        for name, table in NEW_INDEXES:
+            if _index_valid(name) is False:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+        # Order list: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        op.create_index(
+            'ix_orders_user_id_created_at',
+            'orders',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Order list filtered by status
+        op.create_index(
+            'ix_orders_user_id_status_created_at',
+            'orders',
+            ['user_id', 'status', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Latest lyrics: WHERE order_id = ? ORDER BY version DESC LIMIT 1
+        op.create_index(
+            'uq_lyrics_versions_order_id_version',
+            'lyrics_versions',
+            ['order_id', 'version'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # Only drop the old indexes once the new ones are usable
+        for name, _ in NEW_INDEXES:
+            if not _index_valid(name):
+                raise RuntimeError(f"Index {name} is missing or invalid; not dropping old indexes")
+
+        # Single-column indexes are now prefixes of the composite ones
+        op.drop_index(
+            'ix_orders_user_id',
+            table_name='orders',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_lyrics_versions_order_id',
+            table_name='lyrics_versions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_lyrics_versions_order_id',
+            'lyrics_versions',
+            ['order_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_orders_user_id',
+            'orders',
+            ['user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        op.drop_index(
+            'uq_lyrics_versions_order_id_version',
+            table_name='lyrics_versions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_orders_user_id_status_created_at',
+            table_name='orders',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_orders_user_id_created_at',
+            table_name='orders',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
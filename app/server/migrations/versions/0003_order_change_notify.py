@@ -0,0 +1,77 @@
+"""Notify order status transitions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # When the status last changed, so the change feed can backfill status
+    # changes without picking up unrelated updated_at touches
+    op.add_column('orders', sa.Column('status_changed_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE orders SET status_changed_at = updated_at')
+    op.create_index('ix_orders_status_changed_at', 'orders', ['status_changed_at'])
+    op.execute("""
+        CREATE OR REPLACE FUNCTION set_order_status_changed_at() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM NEW.status THEN
+                NEW.status_changed_at := now() AT TIME ZONE 'UTC';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER orders_set_status_changed_at
+        BEFORE INSERT OR UPDATE OF status ON orders
+        FOR EACH ROW
+        EXECUTE FUNCTION set_order_status_changed_at()
+    """)
+
+    # Compact payload for core.change_feed; delivered on commit, so
+    # every writer (API, workers, manual fixes) is covered
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_order_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+                RETURN NEW;
+            END IF;
+            PERFORM pg_notify(
+                'order_changes',
+                json_build_object(
+                    'id', NEW.id,
+                    'u', NEW.user_id,
+                    's', NEW.status,
+                    't', NEW.status_changed_at
+                )::text
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER orders_notify_change
+        AFTER INSERT OR UPDATE OF status ON orders
+        FOR EACH ROW
+        EXECUTE FUNCTION notify_order_change()
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS orders_notify_change ON orders')
+    op.execute('DROP FUNCTION IF EXISTS notify_order_change()')
+    op.execute('DROP TRIGGER IF EXISTS orders_set_status_changed_at ON orders')
+    op.execute('DROP FUNCTION IF EXISTS set_order_status_changed_at()')
+    op.drop_index('ix_orders_status_changed_at', table_name='orders')
+    op.drop_column('orders', 'status_changed_at')
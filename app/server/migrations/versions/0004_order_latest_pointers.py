@@ -0,0 +1,51 @@
+"""Denormalized latest lyrics and audio pointers on orders
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('latest_lyrics_version_id', sa.Integer(), nullable=True))
+    op.add_column('orders', sa.Column('lyrics_version_seq', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('orders', sa.Column('latest_audio_asset_id', sa.Integer(), nullable=True))
+
+    # Backfill from existing rows; updated_at is left untouched
+    op.execute("""
+        UPDATE orders o
+        SET latest_lyrics_version_id = l.id,
+            lyrics_version_seq = l.version
+        FROM (
+            SELECT DISTINCT ON (order_id) order_id, id, version
+            FROM lyrics_versions
+            ORDER BY order_id, version DESC
+        ) l
+        WHERE l.order_id = o.id
+    """)
+    op.execute("""
+        UPDATE orders o
+        SET latest_audio_asset_id = a.id
+        FROM (
+            SELECT order_id, max(id) AS id
+            FROM audio_assets
+            GROUP BY order_id
+        ) a
+        WHERE a.order_id = o.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('orders', 'latest_audio_asset_id')
+    op.drop_column('orders', 'lyrics_version_seq')
+    op.drop_column('orders', 'latest_lyrics_version_id')
@@ -0,0 +1,53 @@
+"""Per-user order list versions
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Kept apart from users, so order writes never lock the user row
+    op.create_table(
+        'order_list_versions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+    # Bumped in the writing transaction, so every writer (API, workers,
+    # manual fixes) is covered; users without a row are at version 0
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_order_list_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO order_list_versions (user_id, version)
+            VALUES (CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END, 1)
+            ON CONFLICT (user_id)
+            DO UPDATE SET version = order_list_versions.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER orders_bump_list_version
+        AFTER INSERT OR UPDATE OR DELETE ON orders
+        FOR EACH ROW
+        EXECUTE FUNCTION bump_order_list_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS orders_bump_list_version ON orders')
+    op.execute('DROP FUNCTION IF EXISTS bump_order_list_version()')
+    op.drop_table('order_list_versions')
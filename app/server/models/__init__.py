@@ -6,6 +6,7 @@ from .lyrics_version import LyricsVersion
 from .audio_asset import AudioAsset
 from .payment import Payment
 from .audit_event import AuditEvent
+from .order_list_version import OrderListVersion
 
 __all__ = [
     "User",
@@ -14,5 +15,6 @@ __all__ = [
     "AudioAsset",
     "Payment",
     "AuditEvent",
+    "OrderListVersion",
 ]
 
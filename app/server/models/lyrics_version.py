@@ -1,7 +1,7 @@
 """Lyrics version model."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Float, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Float, JSON, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -21,7 +21,7 @@ class LyricsVersion(Base):
     __tablename__ = "lyrics_versions"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     version = Column(Integer, nullable=False)
     text = Column(Text, nullable=False)
     gpt_model = Column(String(100), nullable=True)
@@ -38,3 +38,11 @@ class LyricsVersion(Base):
     def __repr__(self):
         return f"<LyricsVersion(id={self.id}, order_id={self.order_id}, version={self.version})>"
 
+
+# Latest version lookup and version uniqueness (see migration 0002)
+Index(
+    "uq_lyrics_versions_order_id_version",
+    LyricsVersion.order_id,
+    LyricsVersion.version,
+    unique=True,
+)
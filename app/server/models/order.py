@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Numeric, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Numeric, JSON, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -21,6 +21,31 @@ class OrderStatus(str, enum.Enum):
     CANCELED = "canceled"
 
 
+# Allowed order status transitions, from each status to the next ones.
+# Re-entering LYRICS_READY records a new lyrics edit, and failed audio
+# generation returns to APPROVED for a retry; DELIVERED and CANCELED are
+# final. USER_EDITING is not part of any flow.
+ORDER_TRANSITIONS = {
+    OrderStatus.DRAFT: frozenset({OrderStatus.PENDING_LYRICS, OrderStatus.CANCELED}),
+    OrderStatus.PENDING_LYRICS: frozenset({OrderStatus.LYRICS_READY, OrderStatus.CANCELED}),
+    OrderStatus.LYRICS_READY: frozenset({
+        OrderStatus.PENDING_LYRICS,
+        OrderStatus.LYRICS_READY,
+        OrderStatus.APPROVED,
+        OrderStatus.CANCELED,
+    }),
+    OrderStatus.USER_EDITING: frozenset(),
+    OrderStatus.APPROVED: frozenset({OrderStatus.GENERATING, OrderStatus.CANCELED}),
+    OrderStatus.GENERATING: frozenset({
+        OrderStatus.DELIVERED,
+        OrderStatus.APPROVED,
+        OrderStatus.CANCELED,
+    }),
+    OrderStatus.DELIVERED: frozenset(),
+    OrderStatus.CANCELED: frozenset(),
+}
+
+
 class OrderLanguage(str, enum.Enum):
     """Order language enum."""
     RU = "ru"
@@ -43,7 +68,7 @@ class Order(Base):
     __tablename__ = "orders"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.DRAFT, nullable=False, index=True)
     language = Column(Enum(OrderLanguage), nullable=False)
     genre = Column(String(100), nullable=True)
@@ -57,6 +82,15 @@ class Order(Base):
     payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.NONE, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Set by a trigger whenever status changes (see migration 0003)
+    status_changed_at = Column(DateTime, nullable=True)
+    
+    # Denormalized pointers maintained on write (see migration 0004). Plain
+    # integers rather than foreign keys, to avoid an orders <-> lyrics
+    # reference cycle.
+    latest_lyrics_version_id = Column(Integer, nullable=True)
+    lyrics_version_seq = Column(Integer, default=0, server_default="0", nullable=False)
+    latest_audio_asset_id = Column(Integer, nullable=True)
     
     # Additional metadata
     metadata = Column(JSON, nullable=True)
@@ -71,3 +105,20 @@ class Order(Base):
     def __repr__(self):
         return f"<Order(id={self.id}, user_id={self.user_id}, status={self.status})>"
 
+
+# Order list, newest first (see migration 0002)
+Index(
+    "ix_orders_user_id_created_at",
+    Order.user_id,
+    Order.created_at.desc(),
+    Order.id.desc(),
+)
+Index(
+    "ix_orders_user_id_status_created_at",
+    Order.user_id,
+    Order.status,
+    Order.created_at.desc(),
+)
+
+# Change feed backfill (see migration 0003)
+Index("ix_orders_status_changed_at", Order.status_changed_at)
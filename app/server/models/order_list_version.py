@@ -0,0 +1,21 @@
+"""Order list version model."""
+
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+
+from core.database import Base
+
+
+class OrderListVersion(Base):
+    """Per-user counter of changes to the user's orders.
+    
+    Bumped by a trigger on every insert, update and delete of an order
+    (see migration 0005), so order list ETags need one primary key lookup.
+    """
+    
+    __tablename__ = "order_list_versions"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    
+    def __repr__(self):
+        return f"<OrderListVersion(user_id={self.user_id}, version={self.version})>"
@@ -0,0 +1,22 @@
+"""Bootstrap schemas."""
+
+from pydantic import BaseModel, TypeAdapter
+from typing import Dict, List, Optional
+
+from .auth import UserResponse
+from .order import LyricsResponse, OrderSummary
+
+
+class BootstrapResponse(BaseModel):
+    """Initial mini app state."""
+    access_token: str
+    token_type: str = "bearer"
+    user: UserResponse
+    orders: List[OrderSummary]
+    next_cursor: Optional[str] = None
+    
+    # Latest lyrics of orders still in progress, by order ID
+    latest_lyrics: Dict[int, LyricsResponse] = {}
+
+
+BOOTSTRAP_RESPONSE_ADAPTER = TypeAdapter(BootstrapResponse)
@@ -1,7 +1,7 @@
 """Order schemas."""
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Optional, List, Dict, Any, Collection, Union
 from datetime import datetime
 from decimal import Decimal
 
@@ -72,6 +72,7 @@ class OrderResponse(BaseModel):
     payment_status: PaymentStatus
     created_at: datetime
     updated_at: datetime
+    lyrics_version_seq: int = 0
     
     # Related data
     lyrics_versions: List[LyricsResponse] = []
@@ -81,12 +82,80 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+class OrderSummary(BaseModel):
+    """Order summary for list views, without notes and related data.
+    
+    ``lyrics_version_seq`` is the number of the latest lyrics version
+    (0 if none), so lists can show it without loading the versions.
+    """
+    id: int
+    status: OrderStatus
+    language: OrderLanguage
+    genre: Optional[str] = None
+    mood: Optional[str] = None
+    tempo: Optional[str] = None
+    occasion: Optional[str] = None
+    recipient: Optional[str] = None
+    price: Optional[Decimal] = None
+    currency: str
+    payment_status: PaymentStatus
+    created_at: datetime
+    updated_at: datetime
+    lyrics_version_seq: int = 0
+    
+    class Config:
+        from_attributes = True
+
+
 class OrderListResponse(BaseModel):
-    """Order list response schema."""
-    items: List[OrderResponse]
-    total: int
+    """Order list response schema.
+    
+    Items are summaries by default and full or sparse orders when the
+    request asks for other fields or related data.
+    """
+    items: List[Union[OrderResponse, OrderSummary]]
+    total: Optional[int] = None
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
+
+
+# Pre-built validators/serializers for the largest payloads
+ORDER_RESPONSE_ADAPTER = TypeAdapter(OrderResponse)
+ORDER_LIST_RESPONSE_ADAPTER = TypeAdapter(OrderListResponse)
+LYRICS_RESPONSE_ADAPTER = TypeAdapter(LyricsResponse)
+
+# Sparse fieldsets: ``?fields=`` selects columns, ``?include=`` relations
+ORDER_RELATIONS = frozenset({"lyrics_versions", "audio_assets"})
+ORDER_FIELDS = frozenset(OrderResponse.model_fields) - ORDER_RELATIONS
+SUMMARY_FIELDS = frozenset(OrderSummary.model_fields)
+
+_RELATION_SCHEMAS = {
+    "lyrics_versions": LyricsResponse,
+    "audio_assets": AudioAssetResponse,
+}
+
+
+def order_projection(
+    order: Any,
+    fields: Collection[str],
+    include: Collection[str],
+) -> Union[OrderResponse, OrderSummary]:
+    """Build a partial order from the requested attributes only.
+    
+    An ``OrderSummary`` when only summary fields are requested, otherwise
+    an ``OrderResponse``. Values come straight from the database, so
+    validation is skipped and columns that were not loaded are never
+    touched. Serialize with ``exclude_unset=True`` to emit just the
+    requested fields.
+    """
+    data = {field: getattr(order, field) for field in fields}
+    for relation in include:
+        schema = _RELATION_SCHEMAS[relation]
+        data[relation] = [schema.model_validate(item) for item in getattr(order, relation)]
+    if not include and SUMMARY_FIELDS.issuperset(fields):
+        return OrderSummary.model_construct(**data)
+    return OrderResponse.model_construct(**data)
 
 
 class LyricsGenerateRequest(BaseModel):
@@ -0,0 +1,29 @@
+"""Shared test fixtures."""
+
+import os
+
+# Required settings without defaults; real values are never used
+for name, value in {
+    "JWT_SECRET": "test-secret",
+    "POSTGRES_PASSWORD": "test",
+    "TELEGRAM_BOT_TOKEN": "123456:test",
+    "TELEGRAM_BOT_WEBHOOK_SECRET": "test",
+    "OPENAI_API_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+
+from core.redis import redis_client
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """In-memory Redis with Lua scripting, also returned by ``get_redis``."""
+    client = FakeAsyncRedis(decode_responses=True)
+    redis_client._client = client
+    yield client
+    redis_client._client = None
+    await client.flushall()
+    await client.aclose()
@@ -0,0 +1,65 @@
+"""Tests for the versioned Redis cache."""
+
+import pytest
+
+from core.cache import VersionedCache
+
+
+@pytest.mark.asyncio
+async def test_get_misses_until_set(redis):
+    cache = VersionedCache("test", ttl=60)
+
+    assert await cache.get(1) == ("0", None)
+
+    await cache.set(1, "0", "body")
+    assert await cache.get(1) == ("0", "body")
+
+
+@pytest.mark.asyncio
+async def test_bump_invalidates_value(redis):
+    cache = VersionedCache("test", ttl=60)
+    await cache.set(1, "0", "old")
+
+    await cache.bump(1)
+
+    assert await cache.get(1) == ("1", None)
+
+
+@pytest.mark.asyncio
+async def test_value_loaded_before_bump_is_never_read(redis):
+    cache = VersionedCache("test", ttl=60)
+    version, _ = await cache.get(1)
+
+    # A writer commits and bumps while the reader is still loading
+    await cache.bump(1)
+    await cache.set(1, version, "stale")
+
+    assert await cache.get(1) == ("1", None)
+
+
+@pytest.mark.asyncio
+async def test_bump_only_touches_given_keys(redis):
+    cache = VersionedCache("test", ttl=60)
+    await cache.set(1, "0", "one")
+    await cache.set(2, "0", "two")
+
+    await cache.bump(1)
+
+    assert await cache.get(2) == ("0", "two")
+
+
+@pytest.mark.asyncio
+async def test_get_reloads_flushed_script(redis):
+    cache = VersionedCache("test", ttl=60)
+    await cache.set(1, "0", "body")
+    await cache.get(1)
+    await redis.script_flush()
+
+    assert await cache.get(1) == ("0", "body")
+
+
+def test_version_and_values_share_a_hash_slot():
+    cache = VersionedCache("test", ttl=60)
+
+    assert cache._version_key(7) == "test:{7}:v"
+    assert cache._value_key(7, "3") == "test:{7}:3"
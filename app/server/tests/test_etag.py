@@ -0,0 +1,41 @@
+"""Tests for ETag helpers."""
+
+import pytest
+
+from core.etag import etag_matches, make_etag, not_modified
+
+
+def test_make_etag_is_quoted_and_stable():
+    etag = make_etag("order", 1, "2024-01-01T00:00:00")
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("order", 1, "2024-01-01T00:00:00")
+
+
+def test_make_etag_depends_on_every_part():
+    assert make_etag("order", 1, 2) != make_etag("order", 1, 3)
+    assert make_etag("order", 12, 3) != make_etag("order", 1, 23)
+
+
+@pytest.mark.parametrize("header", [
+    '"abc"',
+    'W/"abc"',
+    '"other", "abc"',
+    '"other",W/"abc"',
+    '*',
+    ' * ',
+])
+def test_etag_matches(header):
+    assert etag_matches(header, '"abc"')
+
+
+@pytest.mark.parametrize("header", [None, "", '"other"', 'W/"other", "abcd"', "abc"])
+def test_etag_does_not_match(header):
+    assert not etag_matches(header, '"abc"')
+
+
+def test_not_modified_keeps_etag():
+    response = not_modified('"abc"')
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"abc"'
@@ -0,0 +1,33 @@
+"""Tests for the queued log sink."""
+
+import io
+
+import orjson
+import pytest
+import structlog
+
+from core.logs import QueueLogSink
+
+
+def test_sink_writes_queued_events_on_stop():
+    stream = io.BytesIO()
+    sink = QueueLogSink(stream=stream, maxsize=10)
+    sink.start()
+
+    with pytest.raises(structlog.DropEvent):
+        sink(None, "info", {"event": "queued"})
+    sink.stop()
+
+    assert orjson.loads(stream.getvalue()) == {"event": "queued"}
+
+
+def test_stopped_sink_writes_synchronously():
+    stream = io.BytesIO()
+    sink = QueueLogSink(stream=stream, maxsize=10)
+    sink.start()
+    sink.stop()
+
+    with pytest.raises(structlog.DropEvent):
+        sink(None, "info", {"event": "late", "logger": "main"})
+
+    assert orjson.loads(stream.getvalue()) == {"event": "late", "logger": "main"}
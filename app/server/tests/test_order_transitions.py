@@ -0,0 +1,116 @@
+"""Tests for the order status transition table and primitive."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from core.database import Base
+from domain.order_service import InvalidTransition, OrderService
+from models import User, Order
+from models.order import ORDER_TRANSITIONS, OrderLanguage, OrderStatus
+
+
+def test_every_status_has_transitions():
+    assert set(ORDER_TRANSITIONS) == set(OrderStatus)
+    for targets in ORDER_TRANSITIONS.values():
+        assert targets <= set(OrderStatus)
+
+
+def test_final_statuses_have_no_way_out():
+    assert ORDER_TRANSITIONS[OrderStatus.DELIVERED] == frozenset()
+    assert ORDER_TRANSITIONS[OrderStatus.CANCELED] == frozenset()
+
+
+def test_failed_generation_can_be_retried():
+    assert OrderStatus.APPROVED in ORDER_TRANSITIONS[OrderStatus.GENERATING]
+    assert OrderStatus.GENERATING in ORDER_TRANSITIONS[OrderStatus.APPROVED]
+
+
+def test_unused_user_editing_is_unreachable():
+    assert all(OrderStatus.USER_EDITING not in targets for targets in ORDER_TRANSITIONS.values())
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[User.__table__, Order.__table__])
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def add_order(db: AsyncSession, status: OrderStatus) -> Order:
+    user = User(telegram_id=1)
+    db.add(user)
+    await db.flush()
+    order = Order(user_id=user.id, status=status, language=OrderLanguage.EN)
+    db.add(order)
+    await db.commit()
+    return order
+
+
+async def status_of(db: AsyncSession, order_id: int) -> OrderStatus:
+    result = await db.execute(select(Order.status).where(Order.id == order_id))
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_transition_moves_order(db, redis):
+    order = await add_order(db, OrderStatus.APPROVED)
+
+    await OrderService(db).transition(order.id, (OrderStatus.APPROVED,), OrderStatus.GENERATING)
+
+    assert await status_of(db, order.id) == OrderStatus.GENERATING
+
+
+@pytest.mark.asyncio
+async def test_transition_sets_values_in_same_statement(db, redis):
+    order = await add_order(db, OrderStatus.APPROVED)
+
+    await OrderService(db).transition(
+        order.id, (OrderStatus.APPROVED,), OrderStatus.GENERATING, latest_audio_asset_id=42
+    )
+
+    result = await db.execute(select(Order.latest_audio_asset_id).where(Order.id == order.id))
+    assert result.scalar_one() == 42
+
+
+@pytest.mark.asyncio
+async def test_second_racing_transition_is_rejected(db, redis):
+    order = await add_order(db, OrderStatus.APPROVED)
+    service = OrderService(db)
+    await service.transition(order.id, (OrderStatus.APPROVED,), OrderStatus.GENERATING)
+
+    with pytest.raises(InvalidTransition):
+        await service.transition(order.id, (OrderStatus.APPROVED,), OrderStatus.GENERATING)
+
+    assert await status_of(db, order.id) == OrderStatus.GENERATING
+
+
+@pytest.mark.asyncio
+async def test_illegal_edge_is_rejected_before_writing(db, redis):
+    order = await add_order(db, OrderStatus.DELIVERED)
+
+    with pytest.raises(ValueError) as excinfo:
+        await OrderService(db).transition(order.id, (OrderStatus.DELIVERED,), OrderStatus.APPROVED)
+
+    assert not isinstance(excinfo.value, InvalidTransition)
+    assert await status_of(db, order.id) == OrderStatus.DELIVERED
+
+
+@pytest.mark.asyncio
+async def test_missing_order_is_rejected(db, redis):
+    with pytest.raises(InvalidTransition):
+        await OrderService(db).transition(404, (OrderStatus.APPROVED,), OrderStatus.GENERATING)
+
+
+@pytest.mark.asyncio
+async def test_transition_drops_cached_counts(db, redis):
+    order = await add_order(db, OrderStatus.APPROVED)
+    await redis.set(f"orders:count:{order.user_id}:approved", 1)
+
+    await OrderService(db).transition(order.id, (OrderStatus.APPROVED,), OrderStatus.GENERATING)
+
+    assert await redis.get(f"orders:count:{order.user_id}:approved") is None
@@ -0,0 +1,24 @@
+"""Tests for keyset pagination cursors."""
+
+from datetime import datetime
+
+import pytest
+
+from core.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("created_at, item_id", [
+    (datetime(2024, 1, 2, 3, 4, 5), 1),
+    (datetime(2024, 1, 2, 3, 4, 5, 678901), 123456789),
+])
+def test_cursor_round_trip(created_at, item_id):
+    cursor = encode_cursor(created_at, item_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, item_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bm8tc2VwYXJhdG9y", "!!!"])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
@@ -0,0 +1,137 @@
+"""Tests for the sliding window script and the two-tier rate limiter."""
+
+import asyncio
+
+import pytest
+
+from core.rate_limit import RateLimiter, TwoTierRateLimiter
+
+
+async def window_count(redis, key: str) -> int:
+    return int(await redis.hget(key, "c") or 0)
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_rejects_over_limit(redis):
+    limiter = RateLimiter()
+
+    results = [await limiter.hit(redis, "rl:a", 3, 60) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results] == [2, 1, 0, 0]
+    assert await window_count(redis, "rl:a") == 3
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_records_pending_before_check(redis):
+    limiter = RateLimiter()
+
+    result = await limiter.hit(redis, "rl:a", 10, 60, cost=2, pending=9)
+
+    assert not result.allowed
+    assert await window_count(redis, "rl:a") == 9
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_reloads_flushed_script(redis):
+    limiter = RateLimiter()
+    await limiter.hit(redis, "rl:a", 3, 60)
+    await redis.script_flush()
+
+    result = await limiter.hit(redis, "rl:a", 3, 60)
+
+    assert result.allowed
+    assert await window_count(redis, "rl:a") == 2
+
+
+@pytest.mark.asyncio
+async def test_record_many_adds_usage_without_consuming(redis):
+    limiter = RateLimiter()
+
+    results = await limiter.record_many(redis, [("rl:a", 10, 60, 4), ("rl:b", 10, 60, 1)])
+
+    assert [result.remaining for result in results] == [6, 9]
+    assert await window_count(redis, "rl:a") == 4
+    assert await window_count(redis, "rl:b") == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_pending_once(redis):
+    limiter = TwoTierRateLimiter(workers=1)
+    limiter._client = redis
+    bucket = limiter._add_bucket("rl:a", 100, 60)
+    bucket.pending = 5
+
+    await limiter.flush()
+    await limiter.flush()
+
+    assert bucket.pending == 0
+    assert bucket.tokens == 95
+    assert await window_count(redis, "rl:a") == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_hit_and_flush_count_pending_once(redis):
+    limiter = TwoTierRateLimiter(workers=1)
+    limiter._client = redis
+    await limiter.redis_limiter.load(redis)
+    bucket = limiter._add_bucket("rl:a", 100, 60)
+    bucket.pending = 10
+
+    await asyncio.gather(limiter.hit(redis, "rl:a", 100, 60), limiter.flush())
+
+    assert bucket.pending == 0
+    assert await window_count(redis, "rl:a") == 11
+
+
+@pytest.mark.asyncio
+async def test_failed_hit_keeps_pending(redis, monkeypatch):
+    limiter = TwoTierRateLimiter(workers=1)
+    bucket = limiter._add_bucket("rl:a", 100, 60)
+    bucket.pending = 7
+
+    async def fail(*args, **kwargs):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(limiter.redis_limiter, "hit", fail)
+    with pytest.raises(ConnectionError):
+        await limiter.hit(redis, "rl:a", 100, 60)
+
+    assert bucket.pending == 7
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_pending(redis, monkeypatch):
+    limiter = TwoTierRateLimiter(workers=1)
+    limiter._client = redis
+    bucket = limiter._add_bucket("rl:a", 100, 60)
+    bucket.pending = 3
+    limiter._evicted["rl:b"] = (100, 60, 4)
+
+    async def fail(*args, **kwargs):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(limiter.redis_limiter, "record_many", fail)
+    with pytest.raises(ConnectionError):
+        await limiter.flush()
+
+    assert bucket.pending == 3
+    assert limiter._evicted == {"rl:b": (100, 60, 4)}
+
+
+@pytest.mark.asyncio
+async def test_local_quota_is_split_across_workers(redis):
+    limiter = TwoTierRateLimiter(workers=4, sync_threshold=0)
+    await limiter.start(redis)
+    try:
+        await limiter.hit(redis, "rl:a", 100, 60)
+        bucket = limiter._buckets["rl:a"]
+        assert bucket.tokens == 99 // 4
+
+        # The local share runs out long before the global quota
+        admitted_locally = 0
+        while (await limiter.hit(redis, "rl:a", 100, 60)).allowed and bucket.pending:
+            admitted_locally += 1
+        assert admitted_locally == 99 // 4
+    finally:
+        await limiter.stop()
@@ -0,0 +1,16 @@
+"""Tests for order event stream tokens."""
+
+from core.security import TokenCache, create_stream_token, verify_stream_token
+
+
+def test_stream_token_opens_its_order_only():
+    token = create_stream_token(7, 1)
+
+    assert verify_stream_token(token, 1) == 7
+    assert verify_stream_token(token, 2) is None
+
+
+def test_stream_token_is_not_an_access_token():
+    token = create_stream_token(7, 1)
+
+    assert TokenCache().decode(token) is None
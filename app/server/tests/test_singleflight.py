@@ -0,0 +1,186 @@
+"""Tests for single-flight coalescing."""
+
+import asyncio
+
+import pytest
+
+from core.singleflight import SingleFlight, single_flight
+
+
+class Session:
+    """Session stand-in recording whether it is still open."""
+
+    def __init__(self):
+        self.closed = False
+
+
+class Counter:
+    """Service with a slow coalesced read."""
+
+    calls = []
+
+    def __init__(self, db):
+        self.db = db
+
+    @single_flight.coalesce("count")
+    async def read(self, key: int, release: asyncio.Event):
+        Counter.calls.append(self.db)
+        await release.wait()
+        assert not self.db.closed
+        return ("value", key)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    Counter.calls = []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    runs = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return runs
+
+    callers = [asyncio.create_task(flight.do(("load", 1), load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == [1, 1, 1]
+    assert runs == 1
+
+
+@pytest.mark.asyncio
+async def test_finished_call_is_not_cached():
+    flight = SingleFlight()
+    runs = 0
+
+    async def load():
+        nonlocal runs
+        runs += 1
+        return runs
+
+    assert await flight.do(("load",), load) == 1
+    assert await flight.do(("load",), load) == 2
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def load(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        flight.do(("load", 1), lambda: load(1)),
+        flight.do(("load", 2), lambda: load(2)),
+    )
+
+    assert results == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_exception_is_shared():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0)
+        raise LookupError("missing")
+
+    results = await asyncio.gather(
+        flight.do(("load",), load),
+        flight.do(("load",), load),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert flight._calls == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do(("load",), load))
+    second = asyncio.create_task(flight.do(("load",), load))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_uncontended_call_runs_inline_on_callers_session():
+    release = asyncio.Event()
+    release.set()
+    db = Session()
+
+    assert await Counter(db).read(1, release) == ("value", 1)
+    assert Counter.calls == [db]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_coalesced_calls_share_first_callers_run():
+    release = asyncio.Event()
+    request_sessions = [Session(), Session()]
+
+    callers = [
+        asyncio.create_task(Counter(db).read(1, release))
+        for db in request_sessions
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == [("value", 1), ("value", 1)]
+    assert Counter.calls == request_sessions[:1]
+
+
+@pytest.mark.asyncio
+async def test_waiting_caller_reruns_when_first_caller_goes_away():
+    release = asyncio.Event()
+    request_sessions = [Session(), Session()]
+
+    callers = [
+        asyncio.create_task(Counter(db).read(1, release))
+        for db in request_sessions
+    ]
+    await asyncio.sleep(0)
+
+    # The first caller's request ends and its session is closed
+    callers[0].cancel()
+    request_sessions[0].closed = True
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await callers[1] == ("value", 1)
+    assert Counter.calls == request_sessions
+    assert single_flight._calls == {}
+
+
+@pytest.mark.asyncio
+async def test_coalesced_method_key_includes_arguments():
+    release = asyncio.Event()
+    release.set()
+
+    results = await asyncio.gather(
+        Counter(Session()).read(1, release),
+        Counter(Session()).read(2, release),
+    )
+
+    assert results == [("value", 1), ("value", 2)]
+    assert len(Counter.calls) == 2
@@ -1,14 +1,17 @@
 """Audio generation Celery tasks."""
 
+from datetime import datetime
 from celery import current_task
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from celery import celery_app
 from core.database import AsyncSessionLocal
+from core.events import report_progress
 from models.order import Order, OrderStatus
 from models.lyrics_version import LyricsVersion
 from models.audio_asset import AudioAsset, AudioStatus
+from domain.order_service import InvalidTransition, OrderService, order_cache
 from integrations.audio.suno_client import SunoClient
 from core.config import settings
 import structlog
@@ -16,6 +19,17 @@ import structlog
 logger = structlog.get_logger()
 
 
+async def _release_order(db: AsyncSession, order_id: int):
+    """Move a generating order back to APPROVED so audio can be retried."""
+    try:
+        await OrderService(db).transition(
+            order_id, (OrderStatus.GENERATING,), OrderStatus.APPROVED
+        )
+    except InvalidTransition:
+        # Canceled or otherwise moved on in the meantime
+        logger.warning("Order is no longer generating", order_id=order_id)
+
+
 @celery_app.task(bind=True, name="workers.audio_tasks.generate_audio")
 async def generate_audio_task(self, order_id: int, audio_asset_id: int):
     """Generate audio for order."""
@@ -42,36 +56,35 @@ async def generate_audio_task(self, order_id: int, audio_asset_id: int):
             
             if not audio_asset:
                 logger.error("Audio asset not found", audio_asset_id=audio_asset_id)
+                await _release_order(db, order_id)
+                await db.commit()
+                await order_cache.bump(order_id)
                 return {"status": "error", "message": "Audio asset not found"}
             
             # Update task progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={"current": 1, "total": 4, "status": "Preparing audio generation..."}
-            )
+            await report_progress(current_task, order_id, 1, 4, "Preparing audio generation...")
             
             # Get latest lyrics
-            result = await db.execute(
-                select(LyricsVersion)
-                .where(LyricsVersion.order_id == order_id)
-                .order_by(LyricsVersion.version.desc())
-                .limit(1)
-            )
-            lyrics_version = result.scalar_one_or_none()
+            lyrics_version = None
+            if order.latest_lyrics_version_id is not None:
+                lyrics_version = await db.get(LyricsVersion, order.latest_lyrics_version_id)
             
             if not lyrics_version:
                 logger.error("No lyrics found for order", order_id=order_id)
+                audio_asset.status = AudioStatus.FAILED
+                await _release_order(db, order_id)
+                await db.commit()
+                await order_cache.bump(order_id)
                 return {"status": "error", "message": "No lyrics found"}
             
             # Update audio asset status
             audio_asset.status = AudioStatus.GENERATING
+            order.updated_at = datetime.utcnow()  # audio changes invalidate the order's ETag
             await db.commit()
+            await order_cache.bump(order_id)
             
             # Update task progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={"current": 2, "total": 4, "status": "Generating audio with Suno..."}
-            )
+            await report_progress(current_task, order_id, 2, 4, "Generating audio with Suno...")
             
             # Generate audio with Suno
             if settings.use_suno:
@@ -90,10 +103,7 @@ async def generate_audio_task(self, order_id: int, audio_asset_id: int):
                 )
                 
                 # Update task progress
-                current_task.update_state(
-                    state="PROGRESS",
-                    meta={"current": 3, "total": 4, "status": "Processing audio..."}
-                )
+                await report_progress(current_task, order_id, 3, 4, "Processing audio...")
                 
                 # Poll for completion
                 poll_result = await suno_client.poll_generation_status(
@@ -114,7 +124,9 @@ async def generate_audio_task(self, order_id: int, audio_asset_id: int):
                         audio_asset.status = AudioStatus.READY
                         
                         # Update order status
-                        order.status = OrderStatus.DELIVERED
+                        await OrderService(db).transition(
+                            order_id, (OrderStatus.GENERATING,), OrderStatus.DELIVERED
+                        )
                         
                         logger.info(
                             "Audio generation completed",
@@ -134,13 +146,15 @@ async def generate_audio_task(self, order_id: int, audio_asset_id: int):
                 audio_asset.status = AudioStatus.FAILED
                 logger.warning("Suno integration disabled", order_id=order_id)
             
+            if audio_asset.status == AudioStatus.FAILED:
+                await _release_order(db, order_id)
+            
+            order.updated_at = datetime.utcnow()
             await db.commit()
+            await order_cache.bump(order_id)
             
             # Update task progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={"current": 4, "total": 4, "status": "Complete"}
-            )
+            await report_progress(current_task, order_id, 4, 4, "Complete")
             
             return {
                 "status": "success",
@@ -158,10 +172,23 @@ async def generate_audio_task(self, order_id: int, audio_asset_id: int):
                 error=str(e)
             )
             
-            # Update audio asset status to failed
+            # Update audio asset status to failed and allow a retry; by ID,
+            # since the failure may have come before either row was loaded
             try:
-                audio_asset.status = AudioStatus.FAILED
+                await db.rollback()
+                await db.execute(
+                    update(AudioAsset)
+                    .where(AudioAsset.id == audio_asset_id)
+                    .values(status=AudioStatus.FAILED)
+                )
+                await db.execute(
+                    update(Order)
+                    .where(Order.id == order_id)
+                    .values(updated_at=datetime.utcnow())
+                )
+                await _release_order(db, order_id)
                 await db.commit()
+                await order_cache.bump(order_id)
             except:
                 pass
             
@@ -2,11 +2,13 @@
 
 from celery import celery_app
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, update
 from datetime import datetime, timedelta
 
 from core.database import AsyncSessionLocal
+from domain.order_service import order_cache
 from models.audio_asset import AudioAsset
+from models.order import Order
 from models.lyrics_version import LyricsVersion
 from core.config import settings
 import structlog
@@ -36,15 +38,33 @@ async def cleanup_expired_assets():
                 logger.info(f"Cleaning up audio asset {asset.id}")
             
             # Delete old audio assets from database
-            await db.execute(
-                delete(AudioAsset).where(AudioAsset.created_at < cutoff_date)
+            result = await db.execute(
+                delete(AudioAsset)
+                .where(AudioAsset.created_at < cutoff_date)
+                .returning(AudioAsset.order_id)
             )
+            affected_order_ids = set(result.scalars().all())
+            
+            # Removed assets change the orders' responses and ETags, and
+            # may have been the orders' latest audio
+            if affected_order_ids:
+                latest_audio = (
+                    select(func.max(AudioAsset.id))
+                    .where(AudioAsset.order_id == Order.id)
+                    .scalar_subquery()
+                )
+                await db.execute(
+                    update(Order)
+                    .where(Order.id.in_(affected_order_ids))
+                    .values(latest_audio_asset_id=latest_audio, updated_at=datetime.utcnow())
+                )
             
             # Clean up old lyrics versions (keep only latest 5 per order)
             # This is a more complex query that would need to be implemented
             # based on specific business requirements
             
             await db.commit()
+            await order_cache.bump(*affected_order_ids)
             
             logger.info(
                 "Cleanup completed",
@@ -6,10 +6,12 @@ from sqlalchemy import select
 
 from celery import celery_app
 from core.database import AsyncSessionLocal
+from core.events import report_progress
 from models.order import Order, OrderStatus
 from models.lyrics_version import LyricsVersion
 from schemas.order import LyricsGenerateRequest
 from domain.lyrics_service import LyricsService
+from domain.order_service import OrderService, order_cache
 import structlog
 
 logger = structlog.get_logger()
@@ -23,22 +25,10 @@ async def generate_lyrics_task(self, order_id: int, request_data: dict):
     logger.info("Starting lyrics generation task", task_id=task_id, order_id=order_id)
     
     async with AsyncSessionLocal() as db:
+        order_service = OrderService(db)
         try:
-            # Get order
-            result = await db.execute(
-                select(Order).where(Order.id == order_id)
-            )
-            order = result.scalar_one_or_none()
-            
-            if not order:
-                logger.error("Order not found", order_id=order_id)
-                return {"status": "error", "message": "Order not found"}
-            
             # Update task progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={"current": 1, "total": 3, "status": "Generating lyrics..."}
-            )
+            await report_progress(current_task, order_id, 1, 3, "Generating lyrics...")
             
             # Create lyrics service and generate
             lyrics_service = LyricsService(db)
@@ -47,20 +37,17 @@ async def generate_lyrics_task(self, order_id: int, request_data: dict):
             lyrics_version = await lyrics_service.generate_lyrics_sync(order_id, request)
             
             # Update task progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={"current": 2, "total": 3, "status": "Saving lyrics..."}
-            )
+            await report_progress(current_task, order_id, 2, 3, "Saving lyrics...")
             
             # Update order status
-            order.status = OrderStatus.LYRICS_READY
+            await order_service.transition(
+                order_id, (OrderStatus.PENDING_LYRICS,), OrderStatus.LYRICS_READY
+            )
             await db.commit()
+            await order_cache.bump(order_id)
             
             # Update task progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={"current": 3, "total": 3, "status": "Complete"}
-            )
+            await report_progress(current_task, order_id, 3, 3, "Complete")
             
             logger.info(
                 "Lyrics generation completed",
@@ -86,8 +73,12 @@ async def generate_lyrics_task(self, order_id: int, request_data: dict):
             
             # Update order status to error
             try:
-                order.status = OrderStatus.CANCELED
+                await db.rollback()
+                await order_service.transition(
+                    order_id, (OrderStatus.PENDING_LYRICS,), OrderStatus.CANCELED
+                )
                 await db.commit()
+                await order_cache.bump(order_id)
             except:
                 pass
             
@@ -121,6 +112,7 @@ async def regenerate_lyrics_task(order_id: int, request_data: dict):
             request = LyricsGenerateRequest(**request_data)
             
             lyrics_version = await lyrics_service.generate_lyrics_sync(order_id, request)
+            await order_cache.bump(order_id)
             
             logger.info(
                 "Lyrics regeneration completed",
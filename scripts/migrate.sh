@@ -13,6 +13,10 @@ fi
 echo "📝 Applying database migrations..."
 docker-compose exec server alembic upgrade head
 
+# Check that hot queries use the expected indexes
+echo "🔎 Checking query plans..."
+docker-compose exec server python -m benchmarks.check_query_plans
+
 # Check migration status
 echo "✅ Migration status:"
 docker-compose exec server alembic current